@@ -0,0 +1,44 @@
+"""
+Import time of the package in a fresh interpreter, checked against the budget in the README.
+
+    python scripts/bench_import.py [runs]
+
+Prints the best and median of `runs` imports (default 10) and exits with status 1
+when the best one is over IMPORT_BUDGET_MS.
+"""
+import importlib.util
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Documented in the README: a plain `import mmdt_tokenizer` must stay well under this
+IMPORT_BUDGET_MS = 200
+
+_PROBE = """
+import time
+start = time.perf_counter()
+import mmdt_tokenizer
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def import_ms(home):
+    # the package is found where this interpreter finds it, without importing it here
+    package_root = os.path.dirname(os.path.dirname(importlib.util.find_spec("mmdt_tokenizer").origin))
+    env = dict(os.environ, PYTHONPATH=package_root, HOME=home, PYTHONDONTWRITEBYTECODE="1")
+    env.pop("MMDT_TOKENIZER_CACHE_DIR", None)
+    out = subprocess.run([sys.executable, "-c", _PROBE], env=env, cwd=home, capture_output=True,
+                         text=True, check=True).stdout
+    return float(out)
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    with tempfile.TemporaryDirectory() as home:
+        times = [import_ms(home) for _ in range(runs)]
+    best = min(times)
+    print(f"import mmdt_tokenizer: best {best:.1f} ms, median {statistics.median(times):.1f} ms"
+          f" over {runs} runs (budget {IMPORT_BUDGET_MS} ms)")
+    sys.exit(best >= IMPORT_BUDGET_MS)
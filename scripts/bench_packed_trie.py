@@ -0,0 +1,67 @@
+"""
+Memory and lookup speed of the dict trie vs the array-packed trie.
+
+    python scripts/bench_packed_trie.py [n_entries ...]
+
+Each size is a synthetic lexicon of 1-4 syllable entries drawn with a Zipf-like
+skew from a 30k-syllable vocabulary; the bundled lexicons are measured too.
+"""
+import random
+import sys
+import time
+import tracemalloc
+from itertools import accumulate
+
+from mmdt_tokenizer.rule_segmenter.packed_trie import PackedTrie
+from mmdt_tokenizer.rule_segmenter.engine import PIPELINE
+from mmdt_tokenizer.rule_segmenter.scanner import build_lexicon_trie, scan_longest_at
+from mmdt_tokenizer.rule_segmenter.vocab import SyllableVocab
+
+
+def synthetic_pipeline(n_entries, n_syllables=30000, seed=0):
+    rng = random.Random(seed)
+    syllables = [f"s{i}" for i in range(n_syllables)]
+    cum_weights = list(accumulate(1 / (i + 1) for i in range(n_syllables)))
+    entries = {}
+    while len(entries) < n_entries:
+        entries[tuple(rng.choices(syllables, cum_weights=cum_weights, k=rng.randint(1, 4)))] = "SWORD"
+    return [(entries, "SWORD")]
+
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, elapsed, size
+
+
+def lookup_rate(scan, ids, starts):
+    start = time.perf_counter()
+    for i in range(len(ids)):
+        if ids[i] in starts:
+            scan(ids, i)
+    return len(ids) / (time.perf_counter() - start)
+
+
+def bench(name, pipeline):
+    vocab = SyllableVocab()
+    trie, dict_time, dict_bytes = measure(lambda: build_lexicon_trie(pipeline, vocab))
+    da, da_time, da_bytes = measure(lambda: PackedTrie.from_dict(trie))
+
+    rng = random.Random(1)
+    ids = [rng.randrange(2, len(vocab)) for _ in range(200000)]
+    dict_rate = lookup_rate(lambda ids, i: scan_longest_at(ids, i, trie), ids, trie)
+    da_rate = lookup_rate(da.longest_at, ids, da)
+    assert all(scan_longest_at(ids, i, trie) == da.longest_at(ids, i) for i in range(5000) if ids[i] in trie)
+
+    print(f"{name:>10} | dict {dict_bytes / 2**20:8.1f} MB {dict_time:6.2f} s {dict_rate / 1e6:5.2f} M pos/s"
+          f" | packed {da_bytes / 2**20:8.1f} MB (+{da_time:.2f} s) {da_rate / 1e6:5.2f} M pos/s")
+
+
+if __name__ == "__main__":
+    bench("bundled", PIPELINE)
+    for n in map(int, sys.argv[1:] or ["100000", "1000000"]):
+        bench(f"{n:,}", synthetic_pipeline(n))
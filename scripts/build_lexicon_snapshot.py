@@ -0,0 +1,22 @@
+"""
+Rebuild the lexicon snapshot shipped with the package.
+
+    python scripts/build_lexicon_snapshot.py
+
+Run after changing any of the modules hashed by lexicon_fingerprint(); until
+then the bundled snapshot is ignored and the trie is built at import.
+"""
+import os
+
+from mmdt_tokenizer.rule_segmenter.engine import PIPELINE
+from mmdt_tokenizer.rule_segmenter.scanner import build_lexicon_trie
+from mmdt_tokenizer.rule_segmenter.snapshot import BUNDLED_SNAPSHOT, lexicon_fingerprint, save_snapshot
+from mmdt_tokenizer.rule_segmenter.vocab import SyllableVocab
+
+
+if __name__ == "__main__":
+    vocab = SyllableVocab()
+    trie = build_lexicon_trie(PIPELINE, vocab)
+    save_snapshot(BUNDLED_SNAPSHOT, lexicon_fingerprint(), vocab, trie)
+    os.chmod(BUNDLED_SNAPSHOT, 0o644)
+    print(f"{BUNDLED_SNAPSHOT}: {len(vocab)} syllables, {len(trie)} first syllables")
@@ -1,6 +1,7 @@
-from pathlib import Path
 from .tokenizer.word_tokenizer import MyanmarWordTokenizer
 from .tokenizer.syllable_tokenizer import MyanmarSyllableTokenizer
+from .preprocessing.splitter import MAX_UNIT_CHARS
+from .utils.cache import make_cache
 
 
 class MyanmarTokenizer:
@@ -8,18 +9,39 @@ class MyanmarTokenizer:
 
     def __init__(
         self,
-        protect_pattern :bool = True    # <-- default, it is protected. 
+        protect_pattern :bool = True,    # <-- default, it is protected. 
+        engine: str = "trie",            # lexicon matcher: "trie" or "aho_corasick"
+        split_sentences: bool = False,   # segment ။/line-break units independently
+        max_unit_chars: int = MAX_UNIT_CHARS,
+        cache=None,                      # result cache byte budget (or an LRUCache), shared by both tokenizers
+        phrase_memo=None,                # opt-in phrase memo byte budget of the word tokenizer (e.g. PHRASE_MEMO_BYTES)
+        disk_cache=None,                 # SQLite file (or a DiskCache) persisting word tokenize() results
+        dictionaries=(),                 # compiled external dictionary files (see compile_lexicon)
+        lexicon_entries=(),              # runtime lexicon edits to start from (see add_entries)
     ):
+        cache = make_cache(cache)
 
         # Initialize word tokenizer
-        self.word_tokenizer = MyanmarWordTokenizer(protect_pattern=protect_pattern)
+        self.word_tokenizer = MyanmarWordTokenizer(protect_pattern=protect_pattern, engine=engine,
+                                                   split_sentences=split_sentences, max_unit_chars=max_unit_chars,
+                                                   cache=cache, phrase_memo=phrase_memo, disk_cache=disk_cache,
+                                                   dictionaries=dictionaries, lexicon_entries=lexicon_entries)
         
         # Initialize syllabus tokenizer
-        self.syllable_tokenizer = MyanmarSyllableTokenizer()
+        self.syllable_tokenizer = MyanmarSyllableTokenizer(cache=cache)
+
+    def __reduce__(self):
+        return (self.__class__, self.word_tokenizer._config())
 
     
     def word_tokenize(self,*args, **kwargs):
         return self.word_tokenizer.tokenize(*args, **kwargs)
 
     def syllable_tokenize(self, *args, **kwargs):
-        return self.syllable_tokenizer.tokenize(*args, **kwargs)
\ No newline at end of file
+        return self.syllable_tokenizer.tokenize(*args, **kwargs)
+
+    def add_entries(self, entries):
+        self.word_tokenizer.add_entries(entries)
+
+    def remove_entries(self, entries):
+        self.word_tokenizer.remove_entries(entries)
\ No newline at end of file
@@ -12,19 +12,20 @@ def split_punct(text: str, protected: Dict[str, str]) -> List[str]:
     return tokens
 
 
-def collapse_digit_spaces(text: str) -> str:
-    
-    # space around time  
-    text = re.sub(
-        fr'([{MYANMAR_DIGIT}]{{1,2}})\s*:\s*([{MYANMAR_DIGIT}]{{2}})(?:\s*:\s*([{MYANMAR_DIGIT}]{{2}}))?',
-        lambda m: f"{m.group(1)}:{m.group(2)}" + (f":{m.group(3)}" if m.group(3) else ""),
-        text
-    )
+# (pattern, replacement) rules applied in order by collapse_digit_spaces
+DIGIT_SPACE_RULES = [
+    # space around time
+    (re.compile(fr'([{MYANMAR_DIGIT}]{{1,2}})\s*:\s*([{MYANMAR_DIGIT}]{{2}})(?:\s*:\s*([{MYANMAR_DIGIT}]{{2}}))?'),
+     lambda m: f"{m.group(1)}:{m.group(2)}" + (f":{m.group(3)}" if m.group(3) else "")),
     # remove space around separators in Numbers
-    text = re.sub(fr"([{MYANMAR_DIGIT}](?:[,.][{MYANMAR_DIGIT}]{{3}})+)", lambda m: m.group(0).replace(" ", ""), text)
-    
+    (re.compile(fr"([{MYANMAR_DIGIT}](?:[,.][{MYANMAR_DIGIT}]{{3}})+)"), lambda m: m.group(0).replace(" ", "")),
     # space around dates
-    text = re.sub(fr'([{MYANMAR_DIGIT}]{{1,2}})\s*([/\-\.])\s*([{MYANMAR_DIGIT}]{{1,2}})\s*([/\-\.])\s*([{MYANMAR_DIGIT}]{{2,4}})',
-                  r'\1\2\3\4\5', text)
-    
+    (re.compile(fr'([{MYANMAR_DIGIT}]{{1,2}})\s*([/\-\.])\s*([{MYANMAR_DIGIT}]{{1,2}})\s*([/\-\.])\s*([{MYANMAR_DIGIT}]{{2,4}})'),
+     r'\1\2\3\4\5'),
+]
+
+
+def collapse_digit_spaces(text: str) -> str:
+    for pattern, repl in DIGIT_SPACE_RULES:
+        text = pattern.sub(repl, text)
     return text
@@ -0,0 +1,72 @@
+from bisect import bisect_left, bisect_right
+from typing import List, Tuple
+
+# (new_start, new_end, old_start, old_end): text[old_start:old_end] was replaced
+# by the text now at new_text[new_start:new_end]
+Edit = Tuple[int, int, int, int]
+
+
+def sub_tracked(pattern, repl, text: str) -> Tuple[str, List[Edit]]:
+    """pattern.sub(repl, text) that also records where each replacement landed."""
+    parts: List[str] = []
+    edits: List[Edit] = []
+    last = 0
+    shift = 0
+    for m in pattern.finditer(text):
+        start, end = m.span()
+        new = repl(m) if callable(repl) else m.expand(repl)
+        if new == m.group(0):
+            continue
+        parts.append(text[last:start])
+        parts.append(new)
+        edits.append((start + shift, start + shift + len(new), start, end))
+        shift += len(new) - (end - start)
+        last = end
+    if not edits:
+        return text, edits
+    parts.append(text[last:])
+    return "".join(parts), edits
+
+
+class OffsetMap:
+    """
+    Maps character offsets in normalized text back to the original input.
+    Each normalization step that changed the text pushes its edits; offsets are
+    translated back through the steps in reverse order.
+    """
+
+    def __init__(self):
+        self.steps: List[List[Edit]] = []
+
+    def push(self, edits: List[Edit]) -> None:
+        if edits:
+            self.steps.append(edits)
+
+    def span(self, start: int, end: int) -> Tuple[int, int]:
+        """Original (start, end) of the normalized text[start:end]."""
+        for edits in reversed(self.steps):
+            start = _back_start(edits, start)
+            end = _back_end(edits, end)
+        return start, end
+
+
+def _back_start(edits: List[Edit], pos: int) -> int:
+    # last edit starting at or before pos
+    i = bisect_right(edits, (pos, float("inf"))) - 1
+    if i < 0:
+        return pos
+    new_start, new_end, old_start, old_end = edits[i]
+    if pos < new_end:
+        return min(old_start + pos - new_start, old_end)
+    return old_end + pos - new_end
+
+
+def _back_end(edits: List[Edit], pos: int) -> int:
+    # last edit starting before pos
+    i = bisect_left(edits, (pos,)) - 1
+    if i < 0:
+        return pos
+    new_start, new_end, old_start, old_end = edits[i]
+    if pos < new_end:
+        return min(old_start + pos - new_start, old_end)
+    return old_end + pos - new_end
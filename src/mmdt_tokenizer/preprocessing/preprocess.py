@@ -1,11 +1,22 @@
-import re
-from typing import Tuple, Dict, List
+from typing import Tuple, Dict, List, Optional, Set
 
-from .normalizer import split_punct, collapse_digit_spaces
-from .cleaner import remove_punct_outside_protected
-from .protector import protect_patterns
+from .normalizer import DIGIT_SPACE_RULES
+from .protector import find_protected_spans, text_profile
+from .offsets import OffsetMap, sub_tracked
+from ..utils.patterns import PHRASE_TOKEN_PATTERN, RE_SPECIAL_CHARS, RE_GHOST_CHARS, RE_SPACES
 
-SAFE_CHARS = ''.join(chr(c) for c in range(0x10, 0x20) if c not in (0x0a, 0x0d))
+# (start, end, kind) over the normalized text; kind is a PROTECT_KINDS value or TEXT_KIND
+Segment = Tuple[int, int, str]
+TEXT_KIND = "TEXT"
+
+CLEAN_RULES = [
+    (RE_SPECIAL_CHARS, " "),  # remove special characters
+    (RE_GHOST_CHARS, ""),     # remove ghost characters
+    (RE_SPACES, " "),         # shrink space
+]
+
+# placeholder digits: control chars that are neither newlines nor str.isspace()
+SAFE_CHARS = ''.join(chr(c) for c in range(0x10, 0x20) if not chr(c).isspace())
 
 def _encode_counter(n: int) -> str:
     if n == 0:
@@ -19,37 +30,59 @@ def _encode_counter(n: int) -> str:
 
 
 
-def preprocess_burmese_text(text: str) -> Tuple[List[str], Dict[str, str]]:
+def _apply_rules(rules, text: str, offset_map: Optional[OffsetMap]) -> str:
+    if offset_map is None:
+        for pattern, repl in rules:
+            text = pattern.sub(repl, text)
+        return text
+    for pattern, repl in rules:
+        text, edits = sub_tracked(pattern, repl, text)
+        offset_map.push(edits)
+    return text
+
+
+def preprocess_spans(text: str, offset_map: Optional[OffsetMap] = None,
+                     pads: Optional[Set[int]] = None) -> Tuple[str, List[Segment]]:
+    """
+    Normalized text and its typed segments, in order: one (start, end, kind) per
+    protected span, and one TEXT_KIND segment per phrase token between them.
+    Pass an OffsetMap to map segment offsets back to the original input, and a set
+    as `pads` to collect the protected spans cut short of a placeholder pad.
+    """
     if not isinstance(text, str):
         raise ValueError("Input must be a string.")
-    # Step 1: Clean text
-    text = re.sub(r"[~^*_+=<>\[\]{}|\\…“”‘’「」『』\"'#()]+|\.\.+", " ", text) #remove special characters
-    text = re.sub(r'[\u200B\u200C\u200D\uFEFF]', '', text) #remove ghost characters
-    text = re.sub(r'\s+', ' ', text) #shrink space
-    
-    # Step 2: Collapse digit/date/time spacing
-    text = collapse_digit_spaces(text)
-   
-    # Step 3: Protect patterns--> (protection module)
-    protected: Dict[str, str] = {}
-    counter = 1
-    
-    def protect(m: re.Match) -> str:
-        nonlocal counter
-        key = f"\x02{_encode_counter(counter)}\x03"  # no letters/digits
-        protected[key] = m.group(0)
-        counter += 1
-        return f" {key} "
-    
-    text = protect_patterns(text, protect) 
-    
-    # Step 4: Remove unwanted punctuation outside protected (cleaning module)
-    text = remove_punct_outside_protected(text)
-
-    # Step 5: Split punctuation (normalizer module)
-    tokens = split_punct(text, protected)
-
-    # Step 6: Cleanup
-    tokens = [t for t in tokens if t.strip()]
+    text = _apply_rules(CLEAN_RULES, text, offset_map)
 
+    # profile the cleaned text once; later steps only remove characters from it,
+    # so it stays a safe guide to which rules and patterns can still match
+    profile = text_profile(text)
+    if "DIGIT" in profile:
+        text = _apply_rules(DIGIT_SPACE_RULES, text, offset_map)  # collapse digit/date/time spacing
+
+    # protected spans are kept whole; the gaps between them are split into phrase
+    # tokens with unwanted punctuation dropped and the rest split off
+    segments: List[Segment] = []
+    last = 0
+    for span in find_protected_spans(text, profile=profile, pads=pads):
+        segments.extend((m.start(), m.end(), TEXT_KIND) for m in PHRASE_TOKEN_PATTERN.finditer(text, last, span[0]))
+        segments.append(span)
+        last = span[1]
+    segments.extend((m.start(), m.end(), TEXT_KIND) for m in PHRASE_TOKEN_PATTERN.finditer(text, last))
+    return text, segments
+
+
+def preprocess_burmese_text(text: str) -> Tuple[List[str], Dict[str, str]]:
+    """Phrase tokens with each protected span replaced by a placeholder key, and the key -> text map."""
+    pads: Set[int] = set()
+    text, segments = preprocess_spans(text, pads=pads)
+    protected: Dict[str, str] = {}
+    tokens: List[str] = []
+    for start, end, kind in segments:
+        if kind == TEXT_KIND:
+            tokens.append(text[start:end])
+        else:
+            key = f"\x02{_encode_counter(len(protected) + 1)}\x03"  # no letters/digits
+            # like the " key " placeholders did, keep the pad a match ran into
+            protected[key] = text[start:end] + " " if end in pads else text[start:end]
+            tokens.append(key)
     return tokens, protected
@@ -1,5 +1,6 @@
-from typing import Callable
-from ..utils.patterns import PROTECT_PATTERNS
+from typing import Callable, List, Optional, Set, Tuple
+from ..utils.patterns import PROTECT_PATTERNS, PROTECT_KINDS, PROTECT_TRIGGERS, RUN_START_PATTERNS
+from ..utils.patterns import PROFILE_CHARS, PROFILE_SCAN_PATTERN, PROFILE_WORDS, RE_MM_CONSONANT
 import re
 
 PLACEHOLDER_RE = re.compile(r'\x02[^\x03]*\x03')
@@ -27,3 +28,93 @@ def protect_patterns(text: str, replacer: Callable) -> str:
         text = pattern.sub(replacer, text)
     
     return text
+
+
+
+PROTECT_PLAN = [(p, PROTECT_KINDS[p], PROTECT_TRIGGERS[p]) for p in PROTECT_PATTERNS]
+MASK_CHAR = "\x02"
+
+
+def _mask(text: str, spans: List[Tuple[int, int, str]]) -> str:
+    # Each protected span becomes " " + MASK_CHAR...: later patterns see a space right
+    # after the text before it (like the " key " placeholder) and cannot match through it.
+    parts = []
+    last = 0
+    for start, end, _ in spans:
+        parts.append(text[last:start])
+        parts.append(" " + MASK_CHAR * (end - start - 1))
+        last = end
+    parts.append(text[last:])
+    return "".join(parts)
+
+
+def _finditer(pattern: re.Pattern, text: str):
+    """pattern.finditer(text), in linear time for the RUN_START_PATTERNS."""
+    twin = RUN_START_PATTERNS.get(pattern)
+    if twin is None:
+        return pattern.finditer(text)
+    return _finditer_run_starts(pattern, twin, text)
+
+
+def _finditer_run_starts(pattern: re.Pattern, twin: re.Pattern, text: str):
+    pos = 0
+    while True:
+        # right after a match the next one may start inside a run the twin would skip
+        m = pattern.match(text, pos) if pos else None
+        if m is None:
+            m = twin.search(text, pos)
+            if m is None:
+                return
+        yield m
+        pos = m.end()
+
+
+def text_profile(text: str) -> Set[str]:
+    """The PROFILE_CHARS classes and PROFILE_WORDS groups that occur in `text`."""
+    found = set(PROFILE_SCAN_PATTERN.findall(text))
+    profile = {name for name, members in PROFILE_CHARS.items() if not found.isdisjoint(members)}
+    if RE_MM_CONSONANT.search(text):
+        profile.add("CONSONANT")
+    if text[:1].isdecimal():
+        profile.add("LEADING_DIGIT")
+    for name, words in PROFILE_WORDS.items():
+        if any(w in text for w in words):
+            profile.add(name)
+    return profile
+
+
+def find_protected_spans(text: str, plan=PROTECT_PLAN, profile: Optional[Set[str]] = None,
+                         pads: Optional[Set[int]] = None) -> List[Tuple[int, int, str]]:
+    """
+    Fused protection scanner: return sorted, non-overlapping (start, end, kind)
+    spans over `text` instead of rewriting it with placeholders.
+
+    Priority semantics match protect_patterns: patterns run in order and each
+    one only sees what earlier patterns left unprotected. The text is
+    re-masked only after a pattern actually protects something. Patterns whose
+    trigger classes are missing from the text's profile are skipped.
+
+    A match that ran into the space opening an earlier span is cut short of it, so
+    spans never overlap; pass a set as `pads` to collect the ends of those spans.
+    """
+    if profile is None:
+        profile = text_profile(text)
+    spans: List[Tuple[int, int, str]] = []
+    masked = text
+    for pattern, kind, triggers in plan:
+        if not all(t in profile for t in triggers):
+            continue
+        found = [(m.start(), m.end(), kind) for m in _finditer(pattern, masked)]
+        if not found:
+            continue
+        if spans:
+            # a match may swallow the space that opens a masked span; it is not part of the text
+            starts = {start for start, _, _ in spans}
+            if pads is not None:
+                pads.update(end - 1 for _, end, _ in found if end - 1 in starts)
+            found = [(start, end - 1 if end - 1 in starts else end, k) for start, end, k in found]
+            spans = sorted(spans + found)
+        else:
+            spans = found
+        masked = _mask(text, spans)
+    return spans
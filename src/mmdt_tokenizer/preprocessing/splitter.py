@@ -0,0 +1,105 @@
+from bisect import bisect_right
+from typing import List, Optional, Tuple
+
+from .protector import find_protected_spans
+from ..utils.patterns import SENTENCE_END_PATTERN, SYLLABLE_BREAK_PATTERN
+
+# Longest unit handed to the segmenter in one piece (characters)
+MAX_UNIT_CHARS = 4000
+# Characters on each side of a cut scanned for a protected span across it
+PROTECT_WINDOW = 256
+# Sentence ends tried (from the last one back) before cutting inside a sentence
+MAX_CUT_CANDIDATES = 4
+
+
+def split_units(text: str, max_chars: int = MAX_UNIT_CHARS) -> List[Tuple[int, int]]:
+    """
+    (start, end) of each unit of `text`, in order and covering it exactly.
+
+    Units are runs of whole sentences, each ending after ။ or a line break (and
+    the ။ and spaces that follow), of at most `max_chars` characters. A sentence
+    longer than that is cut after its last space before the limit. No cut falls
+    inside a span that a protection pattern keeps whole.
+    """
+    bounds = [m.end() for m in SENTENCE_END_PATTERN.finditer(text)]
+    units: List[Tuple[int, int]] = []
+    start = 0
+    while len(text) - start > max_chars:
+        first, last = bisect_right(bounds, start), bisect_right(bounds, start + max_chars)
+        for cut in reversed(bounds[max(first, last - MAX_CUT_CANDIDATES):last]):
+            if _enclosing_span(text, cut) is None:
+                break
+        else:
+            cut = _cut_point(text, start, max_chars)
+        units.append((start, cut))
+        start = cut
+    if start < len(text) or not units:
+        units.append((start, len(text)))
+    return units
+
+
+def _enclosing_span(text: str, pos: int) -> Optional[Tuple[int, int]]:
+    # the protected span that `pos` falls strictly inside, judged from the text around it
+    lo = max(0, pos - PROTECT_WINDOW)
+    for start, end, _ in find_protected_spans(text[lo:pos + PROTECT_WINDOW]):
+        if start + lo >= pos:
+            break
+        if pos < end + lo:
+            return start + lo, end + lo
+    return None
+
+
+def _cut_point(text: str, start: int, max_chars: int) -> int:
+    limit = start + max_chars
+    cut = text.rfind(" ", start + 1, limit) + 1
+    if cut <= start:
+        # no space: cut at the last Myanmar syllable start (or script change) before the limit,
+        # else at the first one (or space) after it
+        cut = limit
+        while cut > start + 1 and not _syllable_cut(text, cut):
+            cut -= 1
+        if not _syllable_cut(text, cut):
+            cut = limit
+            while cut < len(text) and not _syllable_cut(text, cut):
+                cut += 1
+    span = _enclosing_span(text, cut)
+    if span is not None:
+        # a protected span longer than the limit stays whole
+        cut = span[0] if span[0] > start else span[1]
+    return cut
+
+
+def _syllable_cut(text: str, pos: int) -> bool:
+    # SYLLABLE_BREAK_PATTERN also fires between Latin letters and digits, which
+    # the segmenter keeps together; only breaks next to a Myanmar letter or a space count
+    return (SYLLABLE_BREAK_PATTERN.match(text, pos) is not None
+            and any("\u1000" <= c <= "\u103f" or c.isspace() for c in text[pos - 1:pos + 1]))
+
+
+def unit_start_before(text: str, pos: int, max_chars: int = MAX_UNIT_CHARS) -> int:
+    """
+    The last sentence start before `pos` (0 at the start of the text). With no
+    sentence end in the `max_chars` before it, the last space start instead,
+    so the search never looks further back than that.
+    """
+    lo = max(0, pos - max_chars)
+    start = None
+    for m in SENTENCE_END_PATTERN.finditer(text, lo, pos):
+        if m.end() < pos:
+            start = m.end()
+    if start is not None or lo == 0:
+        return start or 0
+    space = text.rfind(" ", lo, pos - 1)
+    return space + 1 if space >= 0 else lo
+
+
+def unit_end_after(text: str, pos: int, max_chars: int = MAX_UNIT_CHARS) -> int:
+    """The first sentence end after `pos`, like unit_start_before but looking forward."""
+    hi = min(len(text), pos + max_chars)
+    for m in SENTENCE_END_PATTERN.finditer(text, pos, hi):
+        if m.end() > pos:
+            return m.end()
+    if hi == len(text):
+        return hi
+    space = text.find(" ", pos + 1, hi)
+    return space + 1 if space >= 0 else hi
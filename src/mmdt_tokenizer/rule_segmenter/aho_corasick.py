@@ -0,0 +1,101 @@
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+from .lexicon import SKIP
+from .vocab import SyllableVocab, SKIP_ID
+
+
+class AhoCorasick:
+    """
+    Aho–Corasick automaton over syllable-ID sequences.
+    Built from the same (lexicon, tag) pipeline as the merged trie; terminal
+    states keep their tags in pipeline (priority) order.
+    """
+
+    def __init__(self, pipeline: List[Tuple[Dict[Tuple[str, ...], str], str]], vocab: SyllableVocab):
+        self.goto: List[Dict[int, int]] = [{}]
+        self.depth: List[int] = [0]
+        self.tags: List[Optional[List[str]]] = [None]
+
+        for patterns, tag_override in pipeline:
+            for seq, tag in patterns.items():
+                seq = seq if type(seq) is tuple else (seq,)
+                if any(s in SKIP for s in seq):
+                    continue
+                state = 0
+                for s in map(vocab.intern, seq):
+                    nxt = self.goto[state].get(s)
+                    if nxt is None:
+                        nxt = len(self.goto)
+                        self.goto[state][s] = nxt
+                        self.goto.append({})
+                        self.depth.append(self.depth[state] + 1)
+                        self.tags.append(None)
+                    state = nxt
+                if self.tags[state] is None:
+                    self.tags[state] = []
+                tag = tag_override or tag
+                if tag not in self.tags[state]:
+                    self.tags[state].append(tag)
+
+        self._build_links()
+
+    @classmethod
+    def from_trie(cls, trie: dict) -> "AhoCorasick":
+        """The automaton of a merged trie from build_lexicon_trie (or an edited copy of one)."""
+        self = cls.__new__(cls)
+        self.goto, self.depth, self.tags = [{}], [0], [None]
+        stack = [(trie, 0)]
+        while stack:
+            node, state = stack.pop()
+            for s, child in node.items():
+                if s == "_END_":
+                    continue
+                nxt = len(self.goto)
+                self.goto[state][s] = nxt
+                self.goto.append({})
+                self.depth.append(self.depth[state] + 1)
+                end = child.get("_END_")
+                self.tags.append(list(end) if end else None)
+                stack.append((child, nxt))
+        self._build_links()
+        return self
+
+    def _build_links(self):
+        # fail: longest proper suffix state; out: nearest terminal state on the fail chain
+        self.fail: List[int] = [0] * len(self.goto)
+        self.out: List[int] = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for s, nxt in self.goto[state].items():
+                f = self.fail[state]
+                while f and s not in self.goto[f]:
+                    f = self.fail[f]
+                f = self.goto[f].get(s, 0) if state else 0
+                self.fail[nxt] = f
+                self.out[nxt] = f if self.tags[f] is not None else self.out[f]
+                queue.append(nxt)
+
+    def longest_matches(self, ids: Sequence[int]) -> Dict[int, Tuple[int, str]]:
+        """
+        One linear pass over the syllable-ID stream `ids`.
+        Return {start: (end, tag)} holding, for every start position, the longest
+        entry found there and its highest-priority tag. Matches never cross SKIP tokens.
+        """
+        goto, fail, out, depth, tags = self.goto, self.fail, self.out, self.depth, self.tags
+        best: Dict[int, Tuple[int, str]] = {}
+        state = 0
+        for j, t in enumerate(ids):
+            if t == SKIP_ID:
+                state = 0
+                continue
+            while state and t not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(t, 0)
+
+            # ends found later for the same start are always longer, so plain overwrite
+            s = state if tags[state] is not None else out[state]
+            while s:
+                best[j - depth[s] + 1] = (j, tags[s][0])
+                s = out[s]
+        return best
@@ -1,8 +1,23 @@
 from typing import List
-from .types import Chunk
+from .types import Chunk, ChunkBuffer, Tag
 from .lexicon import SKIP
 import re
 
+# rule vocabularies shared by the separate passes and clean_after_merge
+ZW_PATTERN = re.compile(r"[\u200b\ufeff\u2060]")
+NEG_SENT_SFP = ("နဲ့", "နှင့်", "နှင့်")
+ISOLATED_SFP_TO_POSTP = {'ပြီ', '၏', 'စေ', 'သည်'}
+DAY_CL = ("နေ့", "ရက်")
+MTH_CL = "လ"
+PNUM_CL = ("အကြိမ်", "အနှစ်", "အသက်", "အချက်")
+REGION_CL = ("ခရိုင်", "မြို့နယ်", "မြို့", "တိုင်းဒေသကြီး", 
+             "ပြည်နယ်", "နိုင်ငံ", "တောင်", "ကျေးရွာ", "ရွာ",
+             "ရပ်ကွက်", "မြို့ပြ", "မြို့တော်", "မြို့နယ်ခွဲ",
+             "မြို့တော်ကြီး", "ဒေသ", "မြောက်ပိုင်း", "တောင်ပိုင်း",
+             "အရှေ့ပိုင်း", "အနောက်ပိုင်း", "အလယ်ပိုင်း",
+             "မြစ်", "ကမ်းခြေ", "ချောင်း", "တူးမြောင်း")
+SPECIAL_POSTP = ("ကို", "က", "မှာ", "ရော", "အား")
+
 
 def clean_wordnum_tag(chunks: List["Chunk"]) -> List["Chunk"]:
     """
@@ -10,83 +25,86 @@ def clean_wordnum_tag(chunks: List["Chunk"]) -> List["Chunk"]:
     1) Normalize percent word 'ရာခိုင်နှုန်း' (1–3 tokens) -> one INUMCL chunk.
     2) Demote isolated WORDNUM -> RAW.
     """
+    return clean_wordnum_buffer(ChunkBuffer.from_chunks(chunks)).to_chunks()
+
+
+def clean_wordnum_buffer(buf: ChunkBuffer) -> ChunkBuffer:
+    """clean_wordnum_tag over a ChunkBuffer."""
     PERCENT_WORD = "ရာခိုင်နှုန်း"
     MAX_TOKENS = 5
     COMMON_KEYS_PRE = {'ဦး', "ရက်"}
-    out: List["Chunk"] = []
+    PUNCT, NUM, WORDNUM, CL, RAW, INUMCL = Tag.PUNCT, Tag.NUM, Tag.WORDNUM, Tag.CL, Tag.RAW, Tag.INUMCL
+    tags = buf.tags
+    texts = buf.text_list()
+    out = ChunkBuffer(buf.tokens)
     i = 0
-    n = len(chunks)
+    n = len(tags)
+    copied = 0             # chunks before this index are already in `out`
     while i < n:
-        cur = chunks[i]
+        tag = tags[i]
 
         # ---------- Rule 1: percent word (possibly split) ----------
-        txt = ""
+        # matched in place: `pos` characters of the word are covered so far
+        pos = 0
         k = 0
         end = None
-        while i + k < n and k < MAX_TOKENS and chunks[i + k].tag != "PUNCT":
-            txt += chunks[i + k].text
+        while i + k < n and k < MAX_TOKENS and tags[i + k] != PUNCT:
+            txt = texts[i + k]
             k += 1
-            if txt == PERCENT_WORD or txt.startswith(PERCENT_WORD):
+            if txt.startswith(PERCENT_WORD[pos:]):
                 end = i + k
                 break
+            if not PERCENT_WORD.startswith(txt, pos):
+                break  # no longer a prefix: more chunks cannot complete the word
+            pos += len(txt)
 
         if end is not None:
-            span_start = chunks[i].span[0]
-            span_end = chunks[end - 1].span[1]
-            out.append(Chunk((span_start, span_end), PERCENT_WORD, "INUMCL"))
-            i = end
+            exact = pos + len(txt) == len(PERCENT_WORD)
+            out.extend_from(buf, copied, i)
+            out.append(buf.starts[i], buf.ends[end - 1], INUMCL,
+                       None if exact and not buf.texts else PERCENT_WORD)
+            i = copied = end
             continue
 
         # ---------- Rule 2: isolated WORDNUM -> RAW ----------
-        final_tag = cur.tag
-        if cur.tag == "WORDNUM":
+        if tag == WORDNUM:
             p = i - 1
-            while p >= 0 and chunks[p].tag == "PUNCT":p -= 1
+            while p >= 0 and tags[p] == PUNCT:p -= 1
             q = i + 1
-            while q < n and chunks[q].tag == "PUNCT":q += 1
-            prev = chunks[p] if p >= 0 else None
-            nxt  = chunks[q] if q < n else None
+            while q < n and tags[q] == PUNCT:q += 1
 
-            prev_is_num = (prev is not None and prev.tag in ("NUM", "WORDNUM"))
-            next_is_num = (nxt is not None and 
-                        (nxt.tag in ("NUM", "WORDNUM", "CL") or nxt.text in COMMON_KEYS_PRE))
+            prev_is_num = (p >= 0 and tags[p] in (NUM, WORDNUM))
+            next_is_num = (q < n and
+                        (tags[q] in (NUM, WORDNUM, CL) or texts[q] in COMMON_KEYS_PRE))
 
             if not prev_is_num and not next_is_num:
-                final_tag = "RAW"
-
-        out.append(Chunk(cur.span, cur.text, final_tag))
+                out.extend_from(buf, copied, i)
+                out.append_from(buf, i, RAW)
+                copied = i + 1
         i += 1
 
+    out.extend_from(buf, copied, n)
     return out
 
 def clean_cls_tag(chunks: List["Chunk"]) -> List["Chunk"]:
     out: List["Chunk"] = []
-    day_cl = ("နေ့", "ရက်")
-    mth_cl =  "လ"
-    pnum_cl = ("အကြိမ်", "အနှစ်", "အသက်", "အချက်")
-    region_cl = ("ခရိုင်", "မြို့နယ်", "မြို့", "တိုင်းဒေသကြီး", 
-                 "ပြည်နယ်", "နိုင်ငံ", "တောင်", "ကျေးရွာ", "ရွာ",
-                 "ရပ်ကွက်", "မြို့ပြ", "မြို့တော်", "မြို့နယ်ခွဲ",
-                 "မြို့တော်ကြီး", "ဒေသ", "မြောက်ပိုင်း", "တောင်ပိုင်း",
-                 "အရှေ့ပိုင်း", "အနောက်ပိုင်း", "အလယ်ပိုင်း",
-                 "မြစ်", "ကမ်းခြေ", "ချောင်း", "တူးမြောင်း")
 
     for i, cur in enumerate(chunks):
         # default: keep original tag
         final_tag = cur.tag
 
-        if cur.tag in ("CL", "VEP") or cur.text in pnum_cl:
+        if cur.tag in ("CL", "VEP") or cur.text in PNUM_CL:
             prev_tag = chunks[i - 1].tag if i > 0 else None
             next_tag = chunks[i + 1].tag if i+1<len(chunks) else None
 
-            if prev_tag == "DAY" and cur.text in day_cl:
+            if prev_tag == "DAY" and cur.text in DAY_CL:
                 final_tag = "DAYCL"
-            if prev_tag == "MONTH" and cur.text == mth_cl:
+            if prev_tag == "MONTH" and cur.text == MTH_CL:
                 final_tag = "MONTHCL"
-            if prev_tag == "REGION" and cur.text in region_cl:
+            if prev_tag == "REGION" and cur.text in REGION_CL:
                 final_tag = "REGIONCL"
 
-            if next_tag in ("NUM", "WORDNUM") and cur.text in pnum_cl:
+            if next_tag in ("NUM", "WORDNUM") and cur.text in PNUM_CL:
                 final_tag = "INUMCL"
 
         out.append(Chunk(cur.span, cur.text, final_tag))
@@ -106,10 +124,9 @@ def clean_postp_tag(chunks: List["Chunk"]) -> List["Chunk"]:
     out: List["Chunk"] = []
     n = len(chunks)
     i = 0
-    special_postp = ("ကို", "က", "မှာ", "ရော", "အား")
     while i <n:
         ch = chunks[i]
-        if  ch.text in special_postp:
+        if  ch.text in SPECIAL_POSTP:
             prev_tag = chunks[i - 1].tag if i-1 > 0 else None
             prev_text = chunks[i -1].text if i-1 > 0 else ""
             prev_prev_tag = chunks[i - 2].tag if i-2 > 0 else None
@@ -133,8 +150,6 @@ def clean_sfp_chunks(chunks: List["Chunk"]) -> List["Chunk"]:
     """
     Rule 1: PRED + NEG_SET_SFP (NOW TAGGED AS CONJ)
     """
-    NEG_SENT_SFP = ("နဲ့", "နှင့်", "နှင့်")   
-    ISOLATED_SFP_TO_POSTP = {'ပြီ', '၏', 'စေ', 'သည်'}
     out = []
     i = 0
     n = len(chunks)
@@ -173,10 +188,128 @@ def clean_chunks(chunks: List["Chunk"]) -> List["Chunk"]:
     
     cleaned = []
     for ch in chunks:
-        ZW_CHARS = r"[\u200b\ufeff\u2060]" 
-        new_text = re.sub(ZW_CHARS, "", ch.text)
+        new_text = ZW_PATTERN.sub("", ch.text)
 
         if new_text:
             cleaned.append(Chunk(ch.span, new_text, ch.tag))
 
-    return cleaned
\ No newline at end of file
+    return cleaned
+
+
+
+def clean_after_merge(chunks: List["Chunk"]) -> List["Chunk"]:
+    """
+    clean_sfp_chunks, clean_cls_tag, clean_postp_tag and clean_chunks fused into
+    one forward pass with the same result.
+    """
+    return clean_after_merge_buffer(ChunkBuffer.from_chunks(chunks)).to_chunks()
+
+
+def clean_after_merge_buffer(buf: ChunkBuffer) -> ChunkBuffer:
+    """
+    clean_after_merge over a ChunkBuffer.
+
+    Each chunk is held back one step (a PRED may still absorb a following
+    negative CONJ), then given the cls, postp and zero-width rules using the tags
+    those passes would have seen.
+    """
+    PUNCT, RAW, CONJ, PRED, SFP, VEP, POSTP = Tag.PUNCT, Tag.RAW, Tag.CONJ, Tag.PRED, Tag.SFP, Tag.VEP, Tag.POSTP
+    CL, NUM, WORDNUM, INUMCL = Tag.CL, Tag.NUM, Tag.WORDNUM, Tag.INUMCL
+    DAY, DAYCL, MONTH, MONTHCL, REGION, REGIONCL = Tag.DAY, Tag.DAYCL, Tag.MONTH, Tag.MONTHCL, Tag.REGION, Tag.REGIONCL
+    NUMBER_TAGS = (NUM, WORDNUM)
+    tags = buf.tags
+    overrides = buf.texts
+    texts = buf.text_list()
+    out = ChunkBuffer(buf.tokens)
+    n = len(tags)
+    # zero-width characters can only come from the tokens
+    has_zw = buf.tokens is None or ZW_PATTERN.search("".join(buf.tokens)) is not None
+
+    q = 0                  # next non-PUNCT input index after the current one
+    last_tag = None        # sfp stage: tag of the last non-PUNCT chunk produced
+    pending = None         # sfp stage: input index of the last chunk produced, not yet finalized
+    pending_last = None    # its last input index (a PRED may have absorbed a CONJ)
+    pending_tag = None
+    pending_text = None
+    copied = 0             # input chunks before this index are already in `out`
+
+    pos = 0                # index of `pending` in the sfp stage output
+    prev_tag = None        # sfp-stage tag before `pending` (cls looks at it)
+    b1_tag = b1_text = None  # cls-stage tag/text one and two places back (postp looks at them)
+    b2_tag = b2_text = None
+
+    def finalize(first, last, text, tag, next_tag):
+        nonlocal pos, prev_tag, b1_tag, b1_text, b2_tag, b2_text, copied
+        sfp_tag = tag
+
+        # clean_cls_tag
+        if tag == CL or tag == VEP or text in PNUM_CL:
+            if prev_tag == DAY and text in DAY_CL:
+                tag = DAYCL
+            if prev_tag == MONTH and text == MTH_CL:
+                tag = MONTHCL
+            if prev_tag == REGION and text in REGION_CL:
+                tag = REGIONCL
+            if next_tag in NUMBER_TAGS and text in PNUM_CL:
+                tag = INUMCL
+        cls_tag = tag
+
+        # clean_postp_tag (same `i-1 > 0` look-back as the separate pass)
+        if text in SPECIAL_POSTP:
+            p_tag = b1_tag if pos - 1 > 0 else None
+            p_text = b1_text if pos - 1 > 0 else ""
+            pp_tag = b2_tag if pos - 2 > 0 else None
+            pp_text = b2_text if pos - 2 > 0 else ""
+            if (pos == 0 or
+                (p_tag == POSTP and p_text == text) or
+                (p_text == "အ") or
+                (p_tag == PUNCT and pp_tag == POSTP and pp_text == text)):
+                tag = RAW
+
+        # clean_chunks; unchanged chunks are copied later in runs
+        new_text = ZW_PATTERN.sub("", text) if has_zw else text
+        if first != last or tag != tags[first] or new_text != text or not text:
+            out.extend_from(buf, copied, first)
+            if new_text:
+                override = None
+                if new_text != text or (overrides and any(k in overrides for k in range(first, last + 1))):
+                    override = new_text
+                out.append(buf.starts[first], buf.ends[last], tag, override)
+            copied = last + 1
+
+        prev_tag = sfp_tag
+        b2_tag, b2_text = b1_tag, b1_text
+        b1_tag, b1_text = cls_tag, text
+        pos += 1
+
+    for i in range(n):
+        tag = tags[i]
+        text = texts[i]
+
+        # clean_sfp_chunks
+        if (tag == CONJ and text in NEG_SENT_SFP
+            and pending is not None and pending_tag == PRED):
+            pending_last = i
+            pending_text += text
+            continue
+        if q <= i:
+            q = i + 1
+            while q < n and tags[q] == PUNCT: q += 1
+        next_tag = tags[q] if q < n else None
+        if tag == SFP and text in ISOLATED_SFP_TO_POSTP:
+            if last_tag not in (PRED, SFP, VEP) and next_tag not in (PRED, SFP):
+                tag = POSTP
+        if tag == VEP and next_tag not in (SFP, PRED):
+            tag = RAW
+
+        if pending is not None:
+            finalize(pending, pending_last, pending_text, pending_tag, tag)
+        pending = pending_last = i
+        pending_tag, pending_text = tag, text
+        if tag != PUNCT:
+            last_tag = tag
+
+    if pending is not None:
+        finalize(pending, pending_last, pending_text, pending_tag, None)
+    out.extend_from(buf, copied, n)
+    return out
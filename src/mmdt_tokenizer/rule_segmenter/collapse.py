@@ -1,42 +1,59 @@
-from typing import List
-from .types import Chunk
-from .lexicon import FUN_TAG
+from typing import List, Tuple, Union
+from .types import Chunk, ChunkBuffer, Tag, FUN_TAG_CODES
+
+PUNCT_WT_ENDING = {" ", "", ",", "?", "!"}
+
+
+def _as_buffer(sent: Union[List[Chunk], ChunkBuffer]) -> ChunkBuffer:
+    return sent if isinstance(sent, ChunkBuffer) else ChunkBuffer.from_chunks(sent)
+
+
+def _collapse_sentence(buf: ChunkBuffer) -> List[Tuple[str, int, int]]:
+    """Words of one sentence, each with the indices of its first and last chunk."""
+    surface: List[Tuple[str, int, int]] = []
+    parts: List[str] = []
+    buf_start = 0
+    tags = buf.tags
+    texts = buf.text_list()
+    PUNCT = Tag.PUNCT
+
+    def flush(last):
+        if parts:
+            surface.append(("".join(parts), buf_start, last))
+            parts.clear()
+
+    for k in range(len(tags)):
+        tag = tags[k]
+
+        if tag == PUNCT:
+            # skip punctuation except ။ (to mark the end of sentence)
+            txt = texts[k]
+            if surface and txt == "။": surface.append((txt, k, k))
+            flush(k - 1)
+            continue
+
+        if tag in FUN_TAG_CODES:
+            flush(k - 1)
+            surface.append((texts[k], k, k))
+            continue
+
+        if not parts:
+            buf_start = k
+        parts.append(texts[k])
+
+    # push remaining one
+    flush(len(tags) - 1)
+    return [w for w in surface if w[0] not in PUNCT_WT_ENDING]
 
 
 def collapse_to_phrases(chunks):
-   
-    sentences = []
-
-    def flush():
-        if buf:
-            surface.append("".join(buf))
-            buf.clear()
-
-    for sent in chunks: 
-        surface: List[str] = []
-        buf: List[str] = []
-        for ch in sent:
-            tag = getattr(ch, "tag", None)
-            txt = getattr(ch, "text", "") 
-            
-            if tag == "PUNCT":
-                # skip punctuation except ။ (to mark the end of sentence)
-                if surface and txt == "။": surface.append(txt)
-                flush()
-                continue
-
-            if tag in FUN_TAG:
-                flush()
-                surface.append(txt)
-                continue
-            
-            buf.append(txt) 
-
-        
-        # push remaining one
-        flush()
-        PUNCT_WT_ENDING = {" ", "", ",", "?", "!"}
-        all_tokens = [t for t in surface if t not in PUNCT_WT_ENDING]
-    
-        sentences.append(all_tokens)
-    return sentences
+    """Words of each sentence; a sentence is a list of Chunks or a ChunkBuffer."""
+    return [[w for w, _, _ in _collapse_sentence(_as_buffer(sent))] for sent in chunks]
+
+
+def collapse_with_offsets(chunks: Union[List[Chunk], ChunkBuffer],
+                          token_offsets: List[Tuple[int, int]]) -> List[Tuple[str, int, int]]:
+    """(word, start, end) for one sentence, given the character offsets of its syllable tokens."""
+    buf = _as_buffer(chunks)
+    return [(w, token_offsets[buf.starts[first]][0], token_offsets[buf.ends[last]][1])
+            for w, first, last in _collapse_sentence(buf)]
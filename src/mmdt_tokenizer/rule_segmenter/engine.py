@@ -1,61 +1,77 @@
-from typing import List
-from .types import Chunk
-from .lexicon import SKIP
+from typing import Dict, List, Optional, Sequence, Tuple
+from .types import Chunk, ChunkBuffer, Tag, TAG_CODES
 from .lexicon import CONJ, MCONJ, POSTP, SFP, CL, VEP, CLEP, QW
 from .lexicon import MONTH, DAY, PRN, REGION, SWORD, TITLE, REG
-from .scanner import build_trie, scan_longest_at
-from .merge_ops import merge_num_classifier, merge_predicate
-from .cleanner import clean_cls_tag, clean_sfp_chunks, clean_wordnum_tag, clean_postp_tag,clean_chunks
-from ..preprocessing import preprocess_burmese_text
-from ..utils.patterns import TAG_PATTERNS
+from .scanner import scan_longest_at
+from .snapshot import load_lexicon_trie
+from .aho_corasick import AhoCorasick
+from .vocab import SKIP_ID
+from .merge_ops import merge_num_classifier_buffer, merge_predicate_buffer
+from .cleanner import clean_wordnum_buffer, clean_after_merge_buffer
+from ..preprocessing.preprocess import preprocess_spans, TEXT_KIND
+from ..preprocessing.offsets import OffsetMap
+from ..utils.patterns import TAG_PATTERNS, TAG_FIRST_CHARS
+from ..utils.cache import LRUCache, sizeof_tokens
 
 
-import pandas as pd
+# Lexicons in priority order: on equal match length the earlier tag wins.
+PIPELINE = [
 
+    (REGION,  "REGION"),
+    (MONTH, "MONTH"),
+    (DAY, "DAY"),
+    (REG,  "REG"),
+    (SWORD, "SWORD"),
+    (TITLE,  "TITLE"),
+    (PRN,  "PRN"),
 
-TRIE_CONJ  = build_trie(CONJ)
-TRIE_MCONJ  = build_trie(MCONJ)
-TRIE_SFP   = build_trie(SFP)
-TRIE_QW   = build_trie(QW)
-TRIE_VEP   = build_trie(VEP)
-TRIE_POST  = build_trie(POSTP)
-TRIE_UNIT  = build_trie(CL)
-TRIE_CLEP   = build_trie(CLEP)
+    (CONJ,  "CONJ"),
+    (MCONJ,  "MCONJ"),
+    (VEP,   "VEP"),
+    (SFP,   "SFP"),
+    (QW,   "QW"),
+    (POSTP,  "POSTP"),
+    (CL,  "CL"),   
+    (CLEP,  "CLEP"),  
+    
+]
 
-TRIE_MONTH = build_trie(MONTH)
-TRIE_DAY = build_trie(DAY)
-TRIE_REGION   = build_trie(REGION)
-TRIE_REG   = build_trie(REG)
-TRIE_SWORD  = build_trie(SWORD)
-TRIE_TITLE   = build_trie(TITLE)
-TRIE_PRN   = build_trie(PRN)
+# One merged trie for all lexicons, compiled against interned syllable IDs;
+# its root keys double as the first-syllable index used to skip positions
+# that cannot start an entry. Loaded from a snapshot when the lexicons are unchanged.
+VOCAB, LEXICON_TRIE = load_lexicon_trie(PIPELINE)
 
+# Rank of each lexicon tag in PIPELINE; external dictionaries (see mapped_lexicon.py)
+# break equal-length ties with the bundled lexicons by it
+TAG_PRIORITY: Dict[str, int] = {tag: rank for rank, (_, tag) in reversed(list(enumerate(PIPELINE)))}
 
+ENGINES = ("trie", "aho_corasick")
+_AUTOMATON = None
 
-PIPELINE = [
+def _lexicon_automaton() -> AhoCorasick:
+    """The Aho–Corasick engine is optional, so build it on first use."""
+    global _AUTOMATON
+    if _AUTOMATON is None:
+        _AUTOMATON = AhoCorasick(PIPELINE, VOCAB)
+    return _AUTOMATON
+
+
+# first character -> (tag, pattern) pairs of TAG_PATTERNS that can match, in priority order
+_TAG_CANDIDATES: Dict[str, Tuple[Tuple[str, object], ...]] = {}
+
+def _tag_candidates(ch: str):
+    candidates = tuple((tag, p) for tag, patterns in TAG_PATTERNS.items()
+                       for p in patterns if TAG_FIRST_CHARS[p].match(ch))
+    _TAG_CANDIDATES[ch] = candidates
+    return candidates
 
-    (TRIE_REGION,  "REGION"),
-    (TRIE_MONTH, "MONTH"),
-    (TRIE_DAY, "DAY"),
-    (TRIE_REG,  "REG"),
-    (TRIE_SWORD, "SWORD"),
-    (TRIE_TITLE,  "TITLE"),
-    (TRIE_PRN,  "PRN"),
-
-    (TRIE_CONJ,  "CONJ"),
-    (TRIE_MCONJ,  "MCONJ"),
-    (TRIE_VEP,   "VEP"),
-    (TRIE_SFP,   "SFP"),
-    (TRIE_QW,   "QW"),
-    (TRIE_POST,  "POSTP"),
-    (TRIE_UNIT,  "CL"),   
-    (TRIE_CLEP,  "CLEP"),  
-    
-]
 
 def _check_pre_defined_tag(token: str):
-    for tag, patterns in TAG_PATTERNS.items():
-        if any(p.match(token) for p in patterns):
+    candidates = _TAG_CANDIDATES.get(token[0])
+    if candidates is None:
+        candidates = _tag_candidates(token[0])
+    for tag, p in candidates:
+        if p.match(token):
             return tag
     return None
 
@@ -68,56 +84,257 @@ def _flatten_if_nested(syl_tokens):
     return syl_tokens or []
 
 
-def rule_segment(text: str, protect: bool, get_syllabus):
-    # 1) get syllables
-    if protect: 
-        phrase_tokens, protected = preprocess_burmese_text(text)  
-        
-        tokens = []
-        for phrase in phrase_tokens:
-            if phrase in protected:
-                tokens.append(protected[phrase])
-            else:
-                syllable_tokens = _flatten_if_nested(get_syllabus(phrase))
-                syllable_tokens.append(' ')
-                tokens.extend(syllable_tokens)
+def _syllable_tokens(text: str, protect: bool, get_syllabus) -> Tuple[List[str], Dict[int, str]]:
+    """Syllable tokens, and the tag already known for each protected token (by index)."""
+    if not protect:
+        return _flatten_if_nested(get_syllabus(text)), {}
+
+    # protected spans stay whole; every other phrase is syllabified and followed by ' '
+    text, segments = preprocess_spans(text)
+    tokens = []
+    known_tags: Dict[int, str] = {}
+    for start, end, kind in segments:
+        if kind == TEXT_KIND:
+            syllable_tokens = _flatten_if_nested(get_syllabus(text[start:end]))
+            syllable_tokens.append(' ')
+            tokens.extend(syllable_tokens)
+        else:
+            # tagged once here exactly as TAG_PATTERNS would tag it in _label
+            tag = _check_pre_defined_tag(text[start:end])
+            if tag:
+                known_tags[len(tokens)] = tag
+            tokens.append(text[start:end])
+    return tokens, known_tags
+
+
+def _syllable_tokens_with_offsets(text: str, protect: bool,
+                                  get_syllabus) -> Tuple[List[str], Dict[int, str], List[Tuple[int, int]]]:
+    """Same as _syllable_tokens, plus each token's (start, end) in the original text."""
+    offset_map = OffsetMap()
+    if protect:
+        norm, segments = preprocess_spans(text, offset_map)
     else:
-        tokens = _flatten_if_nested(get_syllabus(text))  
-    
-    # 2) single pass labeling (priority + longest-match)
-    chunks: List[Chunk] = []
+        norm, segments = text, [(0, len(text), TEXT_KIND)]
+
+    tokens: List[str] = []
+    known_tags: Dict[int, str] = {}
+    offsets: List[Tuple[int, int]] = []
+    for start, end, kind in segments:
+        piece = norm[start:end]
+        if kind != TEXT_KIND:
+            # a protected match may include surrounding spaces; they are not part of the word
+            tag = _check_pre_defined_tag(piece)
+            if tag:
+                known_tags[len(tokens)] = tag
+            tokens.append(piece)
+            offsets.append(offset_map.span(start + len(piece) - len(piece.lstrip()),
+                                           end - len(piece) + len(piece.rstrip())))
+            continue
+        pos = 0
+        for syl in _flatten_if_nested(get_syllabus(piece)):
+            found = piece.find(syl, pos)
+            if found >= 0:
+                pos = found
+            tokens.append(syl)
+            offsets.append(offset_map.span(start + pos, min(start + pos + len(syl), end)))
+            pos += len(syl)
+        if protect:
+            # the phrase separator is zero-width at the end of its phrase
+            phrase_end = offset_map.span(start, end)[1]
+            tokens.append(' ')
+            offsets.append((phrase_end, phrase_end))
+    return tokens, known_tags, offsets
+
+
+# Suggested byte budget of a tokenizer's phrase memo (the memo is off unless given one)
+PHRASE_MEMO_BYTES = 16 << 20
+
+
+def sizeof_phrase_entry(entry: tuple) -> int:
+    """Approximate bytes of a phrase memo entry: (syllables, starts, ends, tags, offset)."""
+    return sizeof_tokens(entry[0]) + 3 * 64 + 9 * len(entry[3])
+
+
+def rule_segment(text: str, protect: bool, get_syllabus, engine: str = "trie",
+                 memo: Optional[LRUCache] = None, lexicons: Sequence = (), user_lexicon=None) -> List[Chunk]:
+    return rule_segment_buffer(text, protect, get_syllabus, engine, memo, lexicons, user_lexicon).to_chunks()
+
+
+def rule_segment_buffer(text: str, protect: bool, get_syllabus, engine: str = "trie",
+                        memo: Optional[LRUCache] = None, lexicons: Sequence = (),
+                        user_lexicon=None) -> ChunkBuffer:
+    """
+    rule_segment, returning the chunks as a ChunkBuffer over the syllable tokens.
+    `memo` caches each phrase's syllables and lexicon chunks (protected text only).
+    `lexicons` are MappedLexicon dictionaries matched alongside the bundled ones;
+    a UserLexicon replaces the bundled trie with its edited copy.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}', expected one of {ENGINES}")
+
+    if protect and memo is not None:
+        buf = _label_phrases(text, get_syllabus, engine, memo, lexicons, user_lexicon)
+        if buf is not None:
+            return _merge(buf)
+
+    # 1) get syllables
+    tokens, known_tags = _syllable_tokens(text, protect, get_syllabus)
+    return _label_and_merge(tokens, known_tags, engine, lexicons, user_lexicon)
+
+
+def _memo_scope(lexicons: Sequence, user_lexicon) -> tuple:
+    # a memo shared by tokenizers with other dictionaries or edits keeps their phrases apart
+    scope = tuple(lexicon.fingerprint for lexicon in lexicons)
+    return scope + (user_lexicon.fingerprint,) if user_lexicon is not None else scope
+
+
+def _label_phrases(text: str, get_syllabus, engine: str, memo: LRUCache,
+                   lexicons: Sequence = (), user_lexicon=None) -> Optional[ChunkBuffer]:
+    """
+    _syllable_tokens + _label, with each phrase's syllables and chunks taken from
+    `memo` once it has seen the phrase. The ' ' closing every phrase is a SKIP
+    token, so no lexicon match runs across phrases and a phrase labels the same
+    on its own as inside its sentence. Returns None for the rare text where a
+    protected token could start a lexicon match.
+    """
+    text, segments = preprocess_spans(text)
+    pieces = [text[start:end] for start, end, _ in segments]
+    scope = _memo_scope(lexicons, user_lexicon)
+    entries = [memo.get(("phrase", piece, scope) if scope else ("phrase", piece)) if kind == TEXT_KIND else None
+               for piece, (_, _, kind) in zip(pieces, segments)]
+    missing = [k for k, entry in enumerate(entries) if entry is None and segments[k][2] == TEXT_KIND]
+    if missing:
+        _label_new_phrases([pieces[k] for k in missing], get_syllabus, engine, memo, entries, missing,
+                           lexicons, user_lexicon)
+
+    trie = user_lexicon.trie if user_lexicon is not None else LEXICON_TRIE
+    tokens: List[str] = []
+    buf = ChunkBuffer(tokens)
+    starts, ends, tags = buf.starts, buf.ends, buf.tags
+    for piece, entry, (_, _, kind) in zip(pieces, entries, segments):
+        base = len(tokens)
+        if kind != TEXT_KIND:
+            tag = _check_pre_defined_tag(piece)
+            if tag is None and (VOCAB.ids.get(piece) in trie
+                                or any(lex.vocab.ids.get(piece) in lex.trie for lex in lexicons)):
+                return None
+            tokens.append(piece)
+            buf.append(base, base, TAG_CODES[tag] if tag else Tag.RAW)
+            continue
+        syllables, p_starts, p_ends, p_tags, offset = entry
+        tokens.extend(syllables)
+        shift = base - offset
+        if shift:
+            starts.extend([k + shift for k in p_starts])
+            ends.extend([k + shift for k in p_ends])
+        else:
+            starts.extend(p_starts)
+            ends.extend(p_ends)
+        tags.extend(p_tags)
+    return buf
+
+
+def _label_new_phrases(phrases: List[str], get_syllabus, engine: str, memo: LRUCache,
+                       entries: list, slots: List[int], lexicons: Sequence = (), user_lexicon=None) -> None:
+    # label all of a sentence's new phrases in one pass and cut the chunks back apart
+    tokens: List[str] = []
+    bounds = []
+    for phrase in phrases:
+        bounds.append(len(tokens))
+        tokens.extend(_flatten_if_nested(get_syllabus(phrase)))
+        tokens.append(' ')
+    bounds.append(len(tokens))
+    labelled = _label(tokens, {}, engine, lexicons, user_lexicon)
+    scope = _memo_scope(lexicons, user_lexicon)
+    l_starts, l_ends, l_tags = labelled.starts, labelled.ends, labelled.tags
+    c = 0
+    for k, phrase in enumerate(phrases):
+        lo, hi = bounds[k], bounds[k + 1]
+        first = c
+        while l_ends[c] < hi - 1:
+            c += 1
+        c += 1  # the closing ' '
+        # chunk positions stay as labelled; `lo` is where the phrase started
+        entry = (tuple(tokens[lo:hi]), l_starts[first:c], l_ends[first:c], l_tags[first:c], lo)
+        memo.put(("phrase", phrase, scope) if scope else ("phrase", phrase), entry)
+        entries[slots[k]] = entry
+
+
+def rule_segment_with_offsets(text: str, protect: bool, get_syllabus, engine: str = "trie",
+                              lexicons: Sequence = (), user_lexicon=None):
+    """
+    rule_segment plus the (start, end) offsets of every syllable token in `text`;
+    a chunk's span (i, j) covers text[offsets[i][0]:offsets[j][1]].
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}', expected one of {ENGINES}")
+
+    tokens, known_tags, offsets = _syllable_tokens_with_offsets(text, protect, get_syllabus)
+    return _label_and_merge(tokens, known_tags, engine, lexicons, user_lexicon).to_chunks(), offsets
+
+
+def _label_and_merge(tokens: List[str], known_tags: Dict[int, str], engine: str,
+                     lexicons: Sequence = (), user_lexicon=None) -> ChunkBuffer:
+    return _merge(_label(tokens, known_tags, engine, lexicons, user_lexicon))
+
+
+def _label(tokens: List[str], known_tags: Dict[int, str], engine: str, lexicons: Sequence = (),
+           user_lexicon=None) -> ChunkBuffer:
+    # 2) single pass labeling (priority + longest-match) over the syllable-ID stream
+    ids = VOCAB.encode(tokens)
+    trie = user_lexicon.trie if user_lexicon is not None else LEXICON_TRIE
+    matches = None
+    if engine == "aho_corasick":
+        automaton = user_lexicon.automaton() if user_lexicon is not None else _lexicon_automaton()
+        matches = automaton.longest_matches(ids)
+    # each external dictionary has its own syllable IDs
+    external = [(lex.trie, lex.vocab.encode(tokens)) for lex in lexicons]
+    buf = ChunkBuffer(tokens)
+    starts, ends, tags = buf.starts, buf.ends, buf.tags
+    PUNCT, RAW = Tag.PUNCT, Tag.RAW
     i = 0; n = len(tokens)
     while i < n:
         t = tokens[i]
-        if t in SKIP:
-            chunks.append(Chunk((i,i), t, "PUNCT")); i += 1; continue
+        sid = ids[i]
+        starts.append(i)
+        if sid == SKIP_ID:
+            ends.append(i); tags.append(PUNCT); i += 1; continue
         
-        tag = _check_pre_defined_tag(t)
+        # protected tokens carry the tag of the pattern that protected them
+        tag = known_tags.get(i) if known_tags else None
+        if tag is None:
+            tag = _check_pre_defined_tag(t)
 
         if tag: 
-            chunks.append(Chunk((i,i), t, tag)); i += 1; continue
-        m = scan_longest_at(tokens, i, PIPELINE)
-        
-        if m:
-            chunks.append(m); i = m.span[1] + 1
+            ends.append(i); tags.append(TAG_CODES[tag]); i += 1; continue
+        if matches is not None:
+            hit = matches.get(i)
         else:
-            chunks.append(Chunk((i,i), t, "RAW")); i += 1
-
-    # 3) structural merges
-    
-    chunks = clean_wordnum_tag(chunks)
-    
-    chunks = merge_num_classifier(chunks)
-
-    chunks = merge_predicate(chunks)
+            hit = scan_longest_at(ids, i, trie) if sid in trie else None
+        for ext_trie, ext_ids in external:
+            if ext_ids[i] in ext_trie:
+                # as if merged into one trie: longest match, then PIPELINE order
+                other = ext_trie.longest_at(ext_ids, i)
+                if other and (not hit or other[0] > hit[0] or
+                              (other[0] == hit[0] and TAG_PRIORITY[other[1]] < TAG_PRIORITY[hit[1]])):
+                    hit = other
 
+        if hit:
+            end, tag = hit
+            ends.append(end); tags.append(TAG_CODES[tag]); i = end + 1
+        else:
+            ends.append(i); tags.append(RAW); i += 1
+    return buf
 
-    # 4) clean punct after merging
 
-    chunks = clean_sfp_chunks(chunks)
-    chunks = clean_cls_tag(chunks)
+def _merge(buf: ChunkBuffer) -> ChunkBuffer:
+    # 3) structural merges
+    buf = clean_wordnum_buffer(buf)
+    buf = merge_num_classifier_buffer(buf)
+    buf = merge_predicate_buffer(buf)
 
-    chunks = clean_postp_tag(chunks)
-    chunks = clean_chunks(chunks)
+    # 4) clean punct after merging: clean_sfp_chunks, clean_cls_tag, clean_postp_tag
+    #    and clean_chunks, fused into one pass
+    buf = clean_after_merge_buffer(buf)
     
-    return chunks
+    return buf
@@ -0,0 +1,147 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from .engine import TAG_PRIORITY
+from .packed_trie import PackedTrie, build_packed_trie
+from .vocab import SyllableVocab
+
+# Bumped whenever the file layout changes
+MAPPED_LEXICON_VERSION = 1
+_MAGIC = b"MMDTLEX\0"
+# magic, version, byte order (0 little, 1 big), states, syllable bytes, tag bytes, sha1 of the payload;
+# the int32 arrays first, label and term follow, then the "\n"-joined syllables and tags
+_HEADER = struct.Struct("<8sIIIII20s")
+_BYTE_ORDER = 0 if sys.byteorder == "little" else 1
+
+# Maps opened by this process, so every tokenizer naming a file shares one
+_OPEN: Dict[Tuple[str, int, int], "MappedLexicon"] = {}
+
+
+def read_tsv_lexicon(path: str, tag: Optional[str] = None) -> Dict[Tuple[str, ...], str]:
+    """
+    Entries of a TSV dictionary: one word per line, optionally followed by a
+    tab and its tag (`tag` is used where none is given). Words are broken into
+    syllables as in running text; spaces inside a word separate syllables.
+    Blank lines and lines starting with '#' are ignored.
+    """
+    from ..tokenizer.syllable_breaker import syllable_spans
+
+    entries: Dict[Tuple[str, ...], str] = {}
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.rstrip("\r\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            word, _, entry_tag = line.partition("\t")
+            entry_tag = entry_tag.strip() or tag
+            if entry_tag not in TAG_PRIORITY:
+                raise ValueError(f"{path}:{line_no}: tag {entry_tag!r} is not a lexicon tag of the PIPELINE")
+            syllables = tuple(part[start:end] for part in word.split() for start, end in syllable_spans(part))
+            if syllables:
+                entries.setdefault(syllables, entry_tag)
+    return entries
+
+
+def compile_lexicon(sources: Iterable[Union[str, Tuple[str, Optional[str]]]], path: str) -> str:
+    """
+    Compile TSV dictionaries (paths, or (path, default tag) pairs) into one
+    read-only trie file at `path`; returns its fingerprint. An entry found
+    under several tags keeps the one earliest in the engine's PIPELINE.
+    """
+    import hashlib
+    import tempfile
+
+    pipeline = []
+    for source in sources:
+        tsv, tag = (source, None) if isinstance(source, str) else source
+        pipeline.append((read_tsv_lexicon(tsv, tag), None))
+    vocab = SyllableVocab()
+    trie = build_packed_trie(pipeline, vocab)
+
+    tag_names: List[str] = []
+    best = []
+    for tags in trie.tags:
+        tag = min(tags, key=TAG_PRIORITY.__getitem__)
+        if tag not in tag_names:
+            tag_names.append(tag)
+        best.append(tag_names.index(tag))
+    term = array("i", [best[k] if k >= 0 else -1 for k in trie.term])
+    syllables = "\n".join(vocab.syllables[2:]).encode("utf-8")
+    tags = "\n".join(tag_names).encode("utf-8")
+    payload = trie.first.tobytes() + trie.label.tobytes() + term.tobytes() + syllables + tags
+    digest = hashlib.sha1(payload).digest()
+    header = _HEADER.pack(_MAGIC, MAPPED_LEXICON_VERSION, _BYTE_ORDER, len(trie),
+                          len(syllables), len(tags), digest)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(payload)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return digest.hex()
+
+
+class MappedLexicon:
+    """
+    A compiled dictionary file, memory-mapped read-only.
+
+    The trie's state arrays are memoryviews straight into the map, so every
+    process that opens the file shares one copy of them through the page cache;
+    only the syllable-to-ID dict (a few bytes per distinct syllable) and the
+    first-syllable index of the PackedTrie are private. Matches carry the
+    tags of the PIPELINE and rank against the bundled lexicons by its order.
+    """
+
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _HEADER.size:
+            raise ValueError(f"{self.path} is not a compiled lexicon")
+        magic, version, byte_order, n, syllable_bytes, tag_bytes, digest = _HEADER.unpack_from(self._map)
+        if magic != _MAGIC or version != MAPPED_LEXICON_VERSION:
+            raise ValueError(f"{self.path} is not a compiled lexicon of version {MAPPED_LEXICON_VERSION}")
+        if byte_order != _BYTE_ORDER:
+            raise ValueError(f"{self.path} was compiled on a machine of the other byte order; recompile it")
+        if len(self._map) != _HEADER.size + 4 * (3 * n + 1) + syllable_bytes + tag_bytes:
+            raise ValueError(f"{self.path} is truncated")
+        self.fingerprint = digest.hex()
+
+        view = memoryview(self._map)
+        offset = _HEADER.size
+        arrays = []
+        for length in (n + 1, n, n):
+            arrays.append(view[offset:offset + 4 * length].cast("i"))
+            offset += 4 * length
+        syllables = bytes(view[offset:offset + syllable_bytes]).decode("utf-8")
+        offset += syllable_bytes
+        tags = bytes(view[offset:offset + tag_bytes]).decode("utf-8")
+        self.vocab = SyllableVocab(syllables.split("\n") if syllables else ())
+        self.trie = PackedTrie(*arrays, [[tag] for tag in tags.split("\n")])
+
+    def __len__(self) -> int:
+        return len(self.trie)
+
+    def __reduce__(self):
+        # maps do not pickle; the copy maps the same file
+        return (open_mapped_lexicon, (self.path,))
+
+
+def open_mapped_lexicon(path: str) -> MappedLexicon:
+    """The process-wide MappedLexicon of a compiled file (mapped again once the file changes)."""
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns, st.st_size)
+    lexicon = _OPEN.get(key)
+    if lexicon is None:
+        lexicon = _OPEN[key] = MappedLexicon(path)
+    return lexicon
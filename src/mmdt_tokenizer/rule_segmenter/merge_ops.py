@@ -1,140 +1,151 @@
 from typing import List
-from .types import Chunk
-from .lexicon import FUN_TAG
+from .types import Chunk, ChunkBuffer, Tag, FUN_TAG_CODES
 
 
 def merge_num_classifier(chunks: List[Chunk]) -> List[Chunk]:
-    out: List[Chunk] = []
+    return merge_num_classifier_buffer(ChunkBuffer.from_chunks(chunks)).to_chunks()
+
+
+def merge_num_classifier_buffer(buf: ChunkBuffer) -> ChunkBuffer:
+    out = ChunkBuffer(buf.tokens)
+    PUNCT, NUM, WORDNUM, NUMCL, INUMCL, CL, CLEP = Tag.PUNCT, Tag.NUM, Tag.WORDNUM, Tag.NUMCL, Tag.INUMCL, Tag.CL, Tag.CLEP
+    tags = buf.tags
+    texts = buf.text_list()
     i = 0
-    n = len(chunks)
-    NUMBER_TAGS = ("NUM", "WORDNUM")
-    CL_TAGS = ("CL", "CLEP")
+    n = len(tags)
+    copied = 0             # chunks before this index are already in `out`
+    NUMBER_TAGS = (NUM, WORDNUM)
+    CL_TAGS = (CL, CLEP)
     COMMON_KEYS_PRE = {'ဦး', "ရက်", "ပင်", "တို့"}
     PERCENT_WORD = "ရာခိုင်နှုန်း"
     
     while i< n: 
-        cur = chunks[i]
+        tag = tags[i]
 
-        if cur.text == PERCENT_WORD:
-            out.append(Chunk(cur.span, cur.text, "INUMCL"))
-            i += 1
+        if texts[i] == PERCENT_WORD:
+            out.extend_from(buf, copied, i)
+            out.append_from(buf, i, INUMCL)
+            i = copied = i + 1
             continue
 
-        if cur.tag in NUMBER_TAGS:
-            num_start = cur.span[0]
+        if tag in NUMBER_TAGS:
             j = i
             wordnum = 0
             # Merge NUM and punctuation inside the number
-            while j < n and (chunks[j].tag in NUMBER_TAGS or chunks[j].tag == "PUNCT"): 
+            while j < n and (tags[j] in NUMBER_TAGS or tags[j] == PUNCT): 
                 j += 1
-                if(chunks[j].tag == "WORDNUM"): wordnum +=1
+                if(j < n and tags[j] == WORDNUM): wordnum +=1
             
-            if(chunks[j - 1].text == "နှစ်" and wordnum ==1): j -= 1
+            if(texts[j - 1] == "နှစ်" and wordnum ==1): j -= 1
 
-            num_text = "".join(c.text for c in chunks[i:j]).strip().replace(" ", "")
-            num_end = chunks[j - 1].span[1]
-            out.append(Chunk((num_start, num_end), num_text, "NUM"))
+            out.extend_from(buf, copied, i)
+            _append_squeezed(out, buf, i, j - 1, NUM)
 
             # add classifier term
             k = j
-            if k < n and (chunks[k].tag in CL_TAGS or chunks[k].text in COMMON_KEYS_PRE):
-                cl_start = chunks[k].span[0]
-
-                while k < n and (chunks[k].tag in CL_TAGS or chunks[k].text in COMMON_KEYS_PRE):
+            if k < n and (tags[k] in CL_TAGS or texts[k] in COMMON_KEYS_PRE):
+                while k < n and (tags[k] in CL_TAGS or texts[k] in COMMON_KEYS_PRE):
                     k += 1
+                _append_squeezed(out, buf, j, k - 1, NUMCL)
 
-                cl_text = "".join(c.text for c in chunks[j:k]).strip().replace(" ", "")
-                cl_end = chunks[k - 1].span[1]
-                out.append(Chunk((cl_start, cl_end), cl_text, "NUMCL"))
-
-            i = k
+            i = copied = k
             continue
 
-        out.append(cur)
         i +=1
+    out.extend_from(buf, copied, n)
     return out
 
+
+def _append_squeezed(out: ChunkBuffer, buf: ChunkBuffer, a: int, b: int, tag: int) -> None:
+    """Chunks a..b of `buf` as one chunk whose text has its spaces removed."""
+    override = buf.merged_text(a, b)
+    joined = "".join(buf.tokens[buf.starts[a]:buf.ends[b] + 1]) if override is None else override
+    text = joined.strip().replace(" ", "")
+    out.append(buf.starts[a], buf.ends[b], tag, text if text != joined or override is not None else None)
+
+
 def merge_predicate(chunks: List["Chunk"]) -> List["Chunk"]:
-    n = len(chunks)
+    return merge_predicate_buffer(ChunkBuffer.from_chunks(chunks)).to_chunks()
+
+
+def merge_predicate_buffer(buf: ChunkBuffer) -> ChunkBuffer:
+    PUNCT, RAW, SFP, VEP, QW, PRED = Tag.PUNCT, Tag.RAW, Tag.SFP, Tag.VEP, Tag.QW, Tag.PRED
+    tags = buf.tags
+    text = buf.text
+    n = len(tags)
     i = n - 1
-    out = []
+    # output pieces, last first: (a, b) copies chunks a..b-1 unchanged,
+    # (start, end, tag, text) is a new chunk
+    pieces = []
+    copy_end = n
     
     neg_sent_sfp = ("ပါ", "ဘူး", "နဲ့", "နှင့်")
     que_sent_sfp = ("နည်း", 'လား', 'လဲ', 'တုံး')
     neg_prefix = "မ"
+    PRED_TAGS = (SFP, VEP, RAW, QW)
     while i >= 0:
-        if(chunks[i].tag in FUN_TAG):
-            out.append(chunks[i])
+        if(tags[i] in FUN_TAG_CODES):
             i-=1
             continue
-        if chunks[i].tag == "SFP":
+        if tags[i] == SFP:
             j = i
-            raw_indexs = []
             neg_index = None
             que_index = None
             sfp_vep_index = None
-            while j >= 0 and chunks[j].tag in ("SFP", "VEP", "RAW", "QW"): 
-                if chunks[j].tag == "RAW": raw_indexs.append(j)
-                if chunks[j].text == neg_prefix and neg_index is None: neg_index = j
-                if chunks[j].tag == "QW" and que_index is None: que_index = j
-                if chunks[j].tag in ("SFP", "VEP"): sfp_vep_index = j 
+            while j >= 0 and tags[j] in PRED_TAGS: 
+                if text(j) == neg_prefix and neg_index is None: neg_index = j
+                if tags[j] == QW and que_index is None: que_index = j
+                if tags[j] in (SFP, VEP): sfp_vep_index = j 
                 j -= 1
             pred_length = i - j
             if pred_length > 1 :
-                start = chunks[j + 1].span[0]
-                end = chunks[i].span[1]
-                text = "".join(ch.text for ch in chunks[j + 1 : i + 1])
-         
-                if neg_index is not None and chunks[i].text in neg_sent_sfp: 
-                    text = "".join(ch.text for ch in chunks[neg_index : i + 1]) 
-                    pred_start = chunks[neg_index].span[0]       
-                    out.append(Chunk((pred_start, end), text, "PRED"))
-                    text = "".join(ch.text for ch in chunks[j + 1 : neg_index])
-                    raw_end = chunks[neg_index-1].span[1]
-                    out.append(Chunk((start,raw_end), text, "RAW"))
+                pieces.append((i + 1, copy_end))
+                if neg_index is not None and text(i) in neg_sent_sfp: 
+                    pieces.append(_merged(buf, neg_index, i, PRED))
+                    pieces.append(_lead(buf, j + 1, neg_index - 1))
+                    copy_end = j + 1
                 
-                elif que_index is not None and chunks[i].text in que_sent_sfp: 
-                    text = "".join(ch.text for ch in chunks[que_index : i + 1])  
-                    pred_start = chunks[que_index].span[0]            
-                    out.append(Chunk((pred_start, end), text, "PRED"))
-                    text = "".join(ch.text for ch in chunks[j + 1 : que_index])
-                    que_end = chunks[que_index-1].span[1]
-                    out.append(Chunk((start, que_end), text, "RAW"))
+                elif que_index is not None and text(i) in que_sent_sfp: 
+                    pieces.append(_merged(buf, que_index, i, PRED))
+                    pieces.append(_lead(buf, j + 1, que_index - 1))
+                    copy_end = j + 1
 
                 else:
                     # positive pred
-                    
-                    if sfp_vep_index is not None:
-                        k = sfp_vep_index
-                        pred_part = chunks[k : i + 1]
-
-                        if(len(pred_part)>1):
-                            pred_text = "".join(ch.text for ch in pred_part)
-                            pred_start = pred_part[0].span[0]
-                            pred_end = pred_part[-1].span[1]
-                            out.append(Chunk((pred_start, pred_end), pred_text, "PRED"))
-                            
-                        else:
-                            pred_start = chunks[k].span[0]
-                            pred_end = chunks[i].span[1]
-                            pred_text = chunks[k].text
-                            k_index = k +1
-                            #check if it is last in the sentence
-                            while k_index<n and chunks[k_index].tag == "PUNCT": k_index+=1
-                            if (k_index == n):
-                                out.append(Chunk((pred_start, pred_end), pred_text, "PRED"))
-                            else:
-                                out.append(Chunk((pred_start, pred_end), pred_text, "SFP"))
-
-                        #lead unseen part
-                        for t in range(k - 1, j, -1):
-                                out.append(chunks[t])
-                        
-
-     
+                    k = sfp_vep_index
+                    if k < i:
+                        pieces.append(_merged(buf, k, i, PRED))
+                    else:
+                        k_index = k +1
+                        #check if it is last in the sentence
+                        while k_index<n and tags[k_index] == PUNCT: k_index+=1
+                        pieces.append(_merged(buf, k, k, PRED if k_index == n else SFP))
+                    # the lead part before k is kept as it is
+                    copy_end = k
+
                 i = j
                 continue     
 
-        out.append(chunks[i])
         i -= 1
-    return out[::-1]
\ No newline at end of file
+    pieces.append((0, copy_end))
+
+    out = ChunkBuffer(buf.tokens)
+    for piece in reversed(pieces):
+        if len(piece) == 2:
+            out.extend_from(buf, *piece)
+        else:
+            out.append(*piece)
+    return out
+
+
+def _merged(buf: ChunkBuffer, a: int, b: int, tag: int):
+    """(start, end, tag, text) of one chunk covering chunks a..b of `buf`."""
+    return (buf.starts[a], buf.ends[b], tag, buf.merged_text(a, b))
+
+
+def _lead(buf: ChunkBuffer, a: int, b: int):
+    """The RAW chunk before a negative or question predicate; empty when a > b."""
+    if a <= b:
+        return _merged(buf, a, b, Tag.RAW)
+    # keeps the span the list version gave it (b may be -1, i.e. the last chunk)
+    return (buf.starts[a], buf.ends[b], Tag.RAW, "")
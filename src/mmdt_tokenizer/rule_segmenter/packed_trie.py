@@ -0,0 +1,90 @@
+from array import array
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .scanner import build_lexicon_trie
+from .vocab import SyllableVocab
+
+
+class PackedTrie:
+    """
+    A lexicon trie packed into flat integer arrays: the layout of compiled
+    external dictionaries (see mapped_lexicon.py), which are memory-mapped.
+
+    States are numbered breadth-first with each state's children in syllable-ID
+    order, so the children of state s are the contiguous states
+    first[s]..first[s + 1] - 1; label[t] is the syllable ID leading into state t
+    and term[t] indexes `tags` (the tag list of the entry ending there) or is -1.
+    Twelve bytes per state replace a dict per node, which keeps lexicons of
+    10^5 to 10^6 entries compact. `starts` maps each ID that can begin an entry
+    to its state, so the first step (where most walks end) is a dict lookup.
+    """
+    __slots__ = ("first", "label", "term", "tags", "starts")
+
+    def __init__(self, first: array, label: array, term: array, tags: List[List[str]]):
+        self.first = first
+        self.label = label
+        self.term = term
+        self.tags = tags
+        self.starts = {label[t]: t for t in range(first[0], first[1])}
+
+    @classmethod
+    def from_dict(cls, trie: dict) -> "PackedTrie":
+        """Pack a trie from build_lexicon_trie (syllable-ID keys, "_END_" tag lists)."""
+        first, label, term = array("i"), array("i", [0]), array("i", [-1])
+        tags: List[List[str]] = []
+        tag_index: Dict[Tuple[str, ...], int] = {}
+        queue = deque([trie])
+        while queue:
+            node = queue.popleft()
+            first.append(len(label))
+            for sid in sorted(k for k in node if k != "_END_"):
+                child = node[sid]
+                end = child.get("_END_")
+                k = -1
+                if end is not None:
+                    k = tag_index.setdefault(tuple(end), len(tags))
+                    if k == len(tags):
+                        tags.append(list(end))
+                label.append(sid)
+                term.append(k)
+                queue.append(child)
+        first.append(len(label))
+        return cls(first, label, term, tags)
+
+    def __contains__(self, sid) -> bool:
+        return sid in self.starts
+
+    def __len__(self) -> int:
+        return len(self.label)
+
+    def nbytes(self) -> int:
+        """Bytes held by the state arrays."""
+        return sum(len(a) * a.itemsize for a in (self.first, self.label, self.term))
+
+    def longest_at(self, ids: Sequence[int], i: int) -> Optional[Tuple[int, str]]:
+        """Same contract as scanner.scan_longest_at."""
+        state = self.starts.get(ids[i])
+        if state is None:
+            return None
+        first, label, term = self.first, self.label, self.term
+        k = term[state]
+        best: Optional[Tuple[int, str]] = (i, self.tags[k][0]) if k >= 0 else None
+        for j in range(i + 1, len(ids)):
+            lo, hi = first[state], first[state + 1]
+            if lo == hi:
+                break
+            sid = ids[j]
+            state = bisect_left(label, sid, lo, hi)
+            if state == hi or label[state] != sid:
+                break
+            k = term[state]
+            if k >= 0:
+                best = (j, self.tags[k][0])
+        return best
+
+
+def build_packed_trie(pipeline: List[Tuple[Dict[Tuple[str, ...], str], str]], vocab: SyllableVocab) -> PackedTrie:
+    """build_lexicon_trie, packed; the nested dicts only live while it runs."""
+    return PackedTrie.from_dict(build_lexicon_trie(pipeline, vocab))
@@ -1,6 +1,6 @@
-from typing import Dict, Tuple, List, Optional
+from typing import Dict, Tuple, List, Optional, Sequence
 from .lexicon import SKIP
-from .types import Chunk
+from .vocab import SyllableVocab
 
 
 def print_trie(node: dict, prefix: str = "", level: int = 0):
@@ -26,44 +26,97 @@ def build_trie(patterns: Dict[Tuple[str, ...], str]) -> dict:
         node["_END_"] = tag
     return root
 
-def scan_longest_at(tokens: List[str], i: int, pipeline: List[tuple]) -> Optional[Chunk]:
+def build_lexicon_trie(pipeline: List[Tuple[Dict[Tuple[str, ...], str], str]], vocab: SyllableVocab) -> dict:
     """
-    Try all tries (with optional tag override) at position i.
-    Return the longest match as a Chunk or None.
-    pipeline: [(trie_dict, tag_override_or_None), ...] in priority order.
+    Merge every lexicon of the pipeline into a single trie keyed by syllable IDs.
+    Terminal nodes hold the tags of all lexicons containing that entry,
+    in pipeline (priority) order, under the "_END_" key.
+    Entries containing a SKIP syllable can never match and are left out.
     """
-    if tokens[i] in SKIP:
+    root = {}
+    for patterns, tag_override in pipeline:
+        for seq, tag in patterns.items():
+            seq = seq if type(seq) is tuple else (seq,)
+            if any(s in SKIP for s in seq):
+                continue
+            node = root
+            for s in seq:
+                node = node.setdefault(vocab.intern(s), {})
+            tags = node.setdefault("_END_", [])
+            tag = tag_override or tag
+            if tag not in tags:
+                tags.append(tag)
+    return root
+
+def scan_longest_at(ids: Sequence[int], i: int, trie) -> Optional[Tuple[int, str]]:
+    """
+    Walk the merged lexicon trie once from position i of a syllable-ID stream.
+    Return (end, tag) of the longest match or None; on equal length the
+    highest-priority tag (first in the terminal's tag list) wins.
+    `trie` is the nested dict from build_lexicon_trie or a PackedTrie.
+    """
+    if type(trie) is not dict:
+        return trie.longest_at(ids, i)
+    node = trie.get(ids[i])
+    if node is None:
         return None
 
-    n = len(tokens)
-    best_end: Optional[int] = None
-    best_tag: Optional[str] = None
-    best_text: Optional[str] = None
+    n = len(ids)
+    best: Optional[Tuple[int, str]] = None
+    j = i
+    while True:
+        end = node.get("_END_")
+        if end is not None:
+            best = (j, end[0])
+        j += 1
+        if j >= n:
+            break
+        node = node.get(ids[j])
+        if node is None:
+            break
 
-    for trie, tag_override in pipeline:
-        node = trie
-        j = i
-        last_end: Optional[int] = None
-        last_tag: Optional[str] = None
-        while j < n:
-            t = tokens[j]
-            if t in SKIP or t not in node:
-                break
-            node = node[t]; j += 1
-            if "_END_" in node:
-                last_end = j - 1
-                last_tag = tag_override or node["_END_"]
+    return best
 
-        if last_end is not None and last_tag is not None:
-            if best_end is None or last_end > best_end:
-                best_end = last_end
-                best_tag = last_tag
-                best_text = "".join(tokens[i:last_end + 1])
-    
-    if best_end is None:
-        return None
-    assert best_tag is not None
-    assert best_text is not None
+def lexicon_tags(trie: dict, vocab: SyllableVocab, seq: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Tags of entry `seq` in a trie from build_lexicon_trie, in priority order (empty if absent)."""
+    node = trie
+    for s in seq:
+        node = node.get(vocab.ids.get(s))
+        if node is None:
+            return ()
+    return tuple(node.get("_END_", ()))
 
-    return Chunk(span=(i, best_end), text=best_text, tag=best_tag)
-   
+def update_lexicon_trie(trie: dict, vocab: SyllableVocab, changes: Dict[Tuple[str, ...], Tuple[str, ...]]) -> dict:
+    """
+    A copy of `trie` in which each entry of `changes` ends with the given tags
+    (priority order; no tags removes the entry). Copy-on-write: only nodes on
+    changed paths are copied and `trie` itself is never modified, so readers
+    still walking it are unaffected; the rest is shared with the result.
+    """
+    root = dict(trie)
+    fresh = {id(root)}
+    for seq, tags in changes.items():
+        if any(s in SKIP for s in seq):
+            continue
+        if not tags and not lexicon_tags(root, vocab, seq):
+            continue
+        path = [root]
+        for s in seq:
+            node = path[-1]
+            sid = vocab.intern(s)
+            child = node.get(sid)
+            if child is None or id(child) not in fresh:
+                child = dict(child) if child is not None else {}
+                node[sid] = child
+                fresh.add(id(child))
+            path.append(child)
+        if tags:
+            path[-1]["_END_"] = list(tags)
+            continue
+        del path[-1]["_END_"]
+        # drop the nodes left without entries below them
+        for k in range(len(seq), 0, -1):
+            if path[k]:
+                break
+            del path[k - 1][vocab.ids[seq[k - 1]]]
+    return root
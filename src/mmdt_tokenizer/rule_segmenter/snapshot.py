@@ -0,0 +1,75 @@
+import marshal
+import os
+from typing import Dict, List, Optional, Tuple
+
+from .scanner import build_lexicon_trie
+from .vocab import SyllableVocab
+
+# Bumped whenever the snapshot layout changes
+SNAPSHOT_VERSION = 1
+# Prebuilt snapshot shipped with the package (read-only; see scripts/build_lexicon_snapshot.py)
+BUNDLED_SNAPSHOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lexicon.marshal")
+# Writable directory for snapshots of locally changed lexicons; unset, those are built in memory
+SNAPSHOT_DIR = os.environ.get("MMDT_TOKENIZER_CACHE_DIR") or None
+# Modules whose source decides the merged trie: the lexicons, their order, and how they are compiled
+_SOURCES = ("lexicon.py", "engine.py", "scanner.py", "vocab.py")
+
+
+def lexicon_fingerprint() -> str:
+    """Hash of the lexicon sources, the snapshot layout and the marshal format."""
+    import hashlib
+
+    # marshal keeps its format across Python versions for the dicts, tuples,
+    # ints and strs stored here, so one bundled snapshot serves all of them
+    digest = hashlib.sha1(f"{SNAPSHOT_VERSION}:{marshal.version}".encode())
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in _SOURCES:
+        with open(os.path.join(here, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def load_lexicon_trie(pipeline: List[Tuple[Dict[Tuple[str, ...], str], str]], fingerprint: Optional[str] = None,
+                      directory: Optional[str] = SNAPSHOT_DIR,
+                      bundled: Optional[str] = BUNDLED_SNAPSHOT) -> Tuple[SyllableVocab, dict]:
+    """
+    The vocabulary and merged trie of `pipeline`, read from the `bundled`
+    snapshot, or else from one in `directory`, whichever holds this fingerprint
+    (by default lexicon_fingerprint()). Otherwise they are built, and a new
+    snapshot is written to `directory` for the next import (or worker start);
+    the bundled one is never written. With no directory nothing is written.
+    """
+    fingerprint = fingerprint or lexicon_fingerprint()
+    path = os.path.join(directory, f"lexicon-{fingerprint[:16]}.marshal") if directory else None
+    for candidate in (bundled, path):
+        loaded = _read_snapshot(candidate, fingerprint) if candidate else None
+        if loaded is not None:
+            return loaded
+    vocab = SyllableVocab()
+    trie = build_lexicon_trie(pipeline, vocab)
+    if path is not None:
+        save_snapshot(path, fingerprint, vocab, trie)
+    return vocab, trie
+
+
+def _read_snapshot(path: str, fingerprint: str) -> Optional[Tuple[SyllableVocab, dict]]:
+    try:
+        with open(path, "rb") as f:
+            stored, syllables, trie = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    return (SyllableVocab(syllables[2:]), trie) if stored == fingerprint else None
+
+
+def save_snapshot(path: str, fingerprint: str, vocab: SyllableVocab, trie: dict) -> None:
+    """Write a snapshot atomically; a read-only or missing directory is not an error."""
+    import tempfile
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            marshal.dump((fingerprint, vocab.syllables, trie), f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
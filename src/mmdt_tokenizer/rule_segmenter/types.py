@@ -1,5 +1,8 @@
+from array import array
 from dataclasses import dataclass
-from typing import Tuple, List
+from enum import IntEnum
+from typing import Dict, Tuple, List, Optional
+from .lexicon import FUN_TAG
 
 Span = Tuple[int, int]
 
@@ -11,3 +14,137 @@ class Chunk:
 
 Surface = List[str]
 Chunks = List[Chunk]
+
+
+class Tag(IntEnum):
+    """Small-integer chunk tags; Chunk.tag is the member name."""
+    RAW = 0
+    PUNCT = 1
+    # lexicons
+    REGION = 2
+    MONTH = 3
+    DAY = 4
+    REG = 5
+    SWORD = 6
+    TITLE = 7
+    PRN = 8
+    CONJ = 9
+    MCONJ = 10
+    VEP = 11
+    SFP = 12
+    QW = 13
+    POSTP = 14
+    CL = 15
+    CLEP = 16
+    # pre-defined patterns
+    NUM = 17
+    WORDNUM = 18
+    ORG = 19
+    NAME = 20
+    DATE = 21
+    TIME = 22
+    EMAIL = 23
+    URL = 24
+    # produced by the merge and clean rules
+    PRED = 25
+    NUMCL = 26
+    INUMCL = 27
+    DAYCL = 28
+    MONTHCL = 29
+    REGIONCL = 30
+    PARLI = 31
+
+
+TAG_NAMES = [tag.name for tag in Tag]
+TAG_CODES = {tag.name: tag for tag in Tag}
+FUN_TAG_CODES = frozenset(Tag[tag] for tag in FUN_TAG)
+
+
+class ChunkBuffer:
+    """
+    The chunks of one sentence as parallel arrays over its syllable tokens:
+    chunk k covers tokens[starts[k]:ends[k] + 1] and has tag code tags[k].
+
+    A chunk's text is the join of its tokens and is only built when asked for;
+    `texts` holds the few chunks whose text differs (numbers with spaces
+    removed, normalized words, or every chunk of a buffer built from Chunks).
+    """
+    __slots__ = ("tokens", "starts", "ends", "tags", "texts")
+
+    def __init__(self, tokens: Optional[List[str]] = None):
+        self.tokens = tokens
+        self.starts = array("i")
+        self.ends = array("i")
+        self.tags = array("B")
+        self.texts: Dict[int, str] = {}
+
+    @classmethod
+    def from_chunks(cls, chunks: List[Chunk]) -> "ChunkBuffer":
+        buf = cls()
+        for ch in chunks:
+            buf.append(ch.span[0], ch.span[1], TAG_CODES[ch.tag], ch.text)
+        return buf
+
+    def __len__(self) -> int:
+        return len(self.tags)
+
+    def append(self, start: int, end: int, tag: int, text: Optional[str] = None) -> None:
+        if text is not None:
+            self.texts[len(self.tags)] = text
+        self.starts.append(start)
+        self.ends.append(end)
+        self.tags.append(tag)
+
+    def append_from(self, other: "ChunkBuffer", k: int, tag: Optional[int] = None) -> None:
+        """Copy chunk k of `other`, optionally with a new tag."""
+        self.append(other.starts[k], other.ends[k], other.tags[k] if tag is None else tag, other.texts.get(k))
+
+    def extend_from(self, other: "ChunkBuffer", a: int, b: int) -> None:
+        """Copy chunks a..b-1 of `other` as they are."""
+        if a >= b:
+            return
+        texts = other.texts
+        if texts:
+            shift = len(self.tags) - a
+            keys = range(a, b) if b - a < len(texts) else texts
+            for k in keys:
+                if a <= k < b and k in texts:
+                    self.texts[k + shift] = texts[k]
+        self.starts.extend(other.starts[a:b])
+        self.ends.extend(other.ends[a:b])
+        self.tags.extend(other.tags[a:b])
+
+    def merged_text(self, a: int, b: int) -> Optional[str]:
+        """Text override for one chunk covering chunks a..b, or None if it is just their tokens."""
+        texts = self.texts
+        if texts and any(k in texts for k in range(a, b + 1)):
+            return "".join(self.text(k) for k in range(a, b + 1))
+        return None
+
+    def text(self, k: int) -> str:
+        text = self.texts.get(k)
+        if text is not None:
+            return text
+        start, end = self.starts[k], self.ends[k]
+        return self.tokens[start] if start == end else "".join(self.tokens[start:end + 1])
+
+    def text_list(self) -> List[str]:
+        """Every chunk's text, for passes that read all of them."""
+        tokens = self.tokens
+        if tokens is None:
+            out = [""] * len(self.tags)
+        else:
+            out = [tokens[start] if start == end else "".join(tokens[start:end + 1])
+                   for start, end in zip(self.starts, self.ends)]
+        for k, text in self.texts.items():
+            out[k] = text
+        return out
+
+    def chunk(self, k: int) -> Chunk:
+        return Chunk((self.starts[k], self.ends[k]), self.text(k), TAG_NAMES[self.tags[k]])
+
+    def to_chunks(self) -> List[Chunk]:
+        return [self.chunk(k) for k in range(len(self.tags))]
+
+    def __iter__(self):
+        return (self.chunk(k) for k in range(len(self.tags)))
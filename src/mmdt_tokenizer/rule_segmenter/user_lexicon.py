@@ -0,0 +1,75 @@
+import hashlib
+import threading
+from typing import Dict, Iterable, Mapping, Optional, Tuple, Union
+
+from .aho_corasick import AhoCorasick
+from .engine import LEXICON_TRIE, TAG_PRIORITY, VOCAB
+from .scanner import lexicon_tags, update_lexicon_trie
+
+Entry = Union[str, Tuple[str, ...]]
+
+# Writers intern new syllables into the shared VOCAB, one edit at a time
+_EDIT_LOCK = threading.Lock()
+
+
+class UserLexicon:
+    """
+    The merged lexicon trie with runtime edits applied, as one immutable snapshot.
+
+    `entries` holds every entry whose tags differ from the bundled lexicons
+    (no tags: removed) and `fingerprint` hashes them, so equal edits give equal
+    cache keys in any process. Edits produce a new snapshot that shares all
+    unchanged nodes with this one; swapping the reference is the only write
+    readers can observe.
+    """
+    __slots__ = ("trie", "entries", "fingerprint", "_automaton")
+
+    def __init__(self, trie: dict, entries: Dict[Tuple[str, ...], Tuple[str, ...]]):
+        self.trie = trie
+        self.entries = entries
+        self.fingerprint = hashlib.sha1(repr(sorted(entries.items())).encode()).hexdigest()
+        self._automaton: Optional[AhoCorasick] = None
+
+    def automaton(self) -> AhoCorasick:
+        """The Aho–Corasick engine over the edited trie, built on first use."""
+        if self._automaton is None:
+            self._automaton = AhoCorasick.from_trie(self.trie)
+        return self._automaton
+
+
+def _entry(seq: Entry) -> Tuple[str, ...]:
+    return seq if type(seq) is tuple else (seq,)
+
+
+def edit_lexicon(current: Optional[UserLexicon], changes: Mapping[Entry, Tuple[str, ...]]) -> Optional[UserLexicon]:
+    """
+    `current` (None: the bundled lexicons) with each entry of `changes` set to
+    the given tags; None again once nothing differs from the bundled lexicons.
+    """
+    changes = {_entry(seq): tuple(sorted(set(tags), key=TAG_PRIORITY.__getitem__)) for seq, tags in changes.items()}
+    with _EDIT_LOCK:
+        trie = update_lexicon_trie(current.trie if current else LEXICON_TRIE, VOCAB, changes)
+    entries = dict(current.entries) if current else {}
+    for seq, tags in changes.items():
+        if tags == lexicon_tags(LEXICON_TRIE, VOCAB, seq):
+            entries.pop(seq, None)
+        else:
+            entries[seq] = tags
+    return UserLexicon(trie, entries) if entries else None
+
+
+def add_entries(current: Optional[UserLexicon], entries: Mapping[Entry, str]) -> Optional[UserLexicon]:
+    """Add {syllables: tag} entries; a tag joins any the entry already has, in PIPELINE order."""
+    trie = current.trie if current else LEXICON_TRIE
+    changes = {}
+    for seq, tag in entries.items():
+        if tag not in TAG_PRIORITY:
+            raise ValueError(f"Unknown tag {tag!r}, expected a lexicon tag of the PIPELINE")
+        seq = _entry(seq)
+        changes[seq] = changes.get(seq, lexicon_tags(trie, VOCAB, seq)) + (tag,)
+    return edit_lexicon(current, changes)
+
+
+def remove_entries(current: Optional[UserLexicon], entries: Iterable[Entry]) -> Optional[UserLexicon]:
+    """Remove entries, bundled or added, under all their tags."""
+    return edit_lexicon(current, {_entry(seq): () for seq in entries})
@@ -0,0 +1,35 @@
+from array import array
+from typing import Dict, Iterable, List
+from .lexicon import SKIP
+
+UNK_ID = 0    # syllable that appears in no lexicon
+SKIP_ID = 1   # punctuation / whitespace token from SKIP
+
+
+class SyllableVocab:
+    """
+    Interned syllable vocabulary: maps syllables to compact integer IDs.
+    Only lexicon syllables get their own ID; every other syllable encodes
+    to UNK_ID, so the vocabulary does not grow with the input.
+    """
+
+    def __init__(self, syllables: Iterable[str] = ()):
+        self.ids: Dict[str, int] = dict.fromkeys(SKIP, SKIP_ID)
+        self.syllables: List[str] = ["<unk>", "<skip>"]
+        for syllable in syllables:
+            self.intern(syllable)
+
+    def __len__(self) -> int:
+        return len(self.syllables)
+
+    def intern(self, syllable: str) -> int:
+        sid = self.ids.get(syllable)
+        if sid is None:
+            sid = len(self.syllables)
+            self.ids[syllable] = sid
+            self.syllables.append(syllable)
+        return sid
+
+    def encode(self, tokens: List[str]) -> array:
+        get = self.ids.get
+        return array("i", [get(t, UNK_ID) for t in tokens])
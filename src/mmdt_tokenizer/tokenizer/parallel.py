@@ -0,0 +1,152 @@
+import atexit
+import os
+import threading
+from collections import deque
+from functools import partial
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from ..preprocessing.splitter import split_units
+
+# Persistent worker pools, one per pool size, shared by every tokenizer.
+# Workers build the lexicon tries once (at import) and are reused across calls.
+_POOLS: Dict[int, object] = {}
+_POOLS_LOCK = threading.Lock()
+
+# Worker-side tokenizers, one per configuration (runtime lexicon edits aside)
+_WORKER_TOKENIZERS: Dict[Tuple, object] = {}
+
+# Runtime lexicon edits handed to workers: one file per UserLexicon fingerprint,
+# written by the parent once and read by each worker the first time it needs it
+_PUBLISHED: Dict[str, str] = {}
+_PUBLISH_LOCK = threading.Lock()
+_PUBLISH_DIR: Optional[str] = None
+
+DEFAULT_CHUNKSIZE = 64
+
+
+def resolve_n_jobs(n_jobs: int) -> int:
+    """joblib-style: 1 = serial, -1 = all cores, -2 = all but one, ..."""
+    if n_jobs is None or n_jobs == 0:
+        return 1
+    if n_jobs < 0:
+        return max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    return n_jobs
+
+
+def get_pool(processes: int):
+    with _POOLS_LOCK:
+        pool = _POOLS.get(processes)
+        if pool is None:
+            from multiprocessing import get_context  # only needed once a pool is started
+            pool = get_context().Pool(processes, initializer=_init_worker)
+            _POOLS[processes] = pool
+        return pool
+
+
+def shutdown_pools():
+    """Stop every persistent worker pool (also runs at interpreter exit)."""
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.close()
+        pool.join()
+
+
+atexit.register(shutdown_pools)
+
+
+def publish_user_lexicon(user_lexicon) -> Optional[Tuple[str, str]]:
+    """
+    (fingerprint, path) naming a UserLexicon for workers, or None without edits.
+    Tasks carry only this pair; a worker loads the entries when it lacks them.
+    """
+    global _PUBLISH_DIR
+    if user_lexicon is None:
+        return None
+    fingerprint = user_lexicon.fingerprint
+    with _PUBLISH_LOCK:
+        path = _PUBLISHED.get(fingerprint)
+        if path is None:
+            import pickle
+            import shutil
+            import tempfile
+
+            if _PUBLISH_DIR is None:
+                _PUBLISH_DIR = tempfile.mkdtemp(prefix="mmdt-lexicon-")
+                atexit.register(shutil.rmtree, _PUBLISH_DIR, True)
+            path = os.path.join(_PUBLISH_DIR, f"{fingerprint}.pickle")
+            with open(path, "wb") as f:
+                pickle.dump(user_lexicon.entries, f, pickle.HIGHEST_PROTOCOL)
+            _PUBLISHED[fingerprint] = path
+        return fingerprint, path
+
+
+def _init_worker():
+    # importing the engine builds the merged lexicon trie once per worker
+    from ..rule_segmenter import engine  # noqa: F401
+
+
+def _segment_in_worker(config: Tuple, lexicon: Optional[Tuple[str, str]], method: str, text: str):
+    tokenizer = _WORKER_TOKENIZERS.get(config)
+    if tokenizer is None:
+        from .word_tokenizer import MyanmarWordTokenizer
+        tokenizer = MyanmarWordTokenizer(*config)
+        _WORKER_TOKENIZERS[config] = tokenizer
+    current = tokenizer._user_lexicon
+    if (current.fingerprint if current is not None else None) != (lexicon[0] if lexicon else None):
+        # only the latest edits are kept; the phrase memo and cache keys tell them apart
+        tokenizer._user_lexicon = _load_user_lexicon(lexicon)
+    return getattr(tokenizer, method)(text)
+
+
+def _load_user_lexicon(lexicon: Optional[Tuple[str, str]]):
+    if lexicon is None:
+        return None
+    import pickle
+    from ..rule_segmenter.user_lexicon import edit_lexicon
+
+    with open(lexicon[1], "rb") as f:
+        return edit_lexicon(None, pickle.load(f))
+
+
+def imap_segment(config: Tuple, texts: Iterable[str], n_jobs: int,
+                 chunksize: int = DEFAULT_CHUNKSIZE, method: str = "tokenize_one",
+                 lexicon: Optional[Tuple[str, str]] = None) -> Iterator:
+    """
+    Ordered, lazy map of a MyanmarWordTokenizer method over `texts` on a persistent pool:
+    "tokenize_one" yields word lists, "_tokenize_one" chunk lists and
+    "tokenize_with_offsets" (word, start, end) lists. `lexicon` is the
+    publish_user_lexicon() of the runtime edits to apply, if any.
+    """
+    pool = get_pool(resolve_n_jobs(n_jobs))
+    return pool.imap(partial(_segment_in_worker, config, lexicon, method), texts, chunksize)
+
+
+def imap_segment_units(config: Tuple, texts: Iterable[str], n_jobs: int, max_unit_chars: int,
+                       chunksize: int = DEFAULT_CHUNKSIZE, method: str = "tokenize_one",
+                       lexicon: Optional[Tuple[str, str]] = None) -> Iterator[list]:
+    """
+    imap_segment over the sentence units of each text (see split_units), so one
+    long text is spread over several workers; yields each text's results joined
+    back together, in input order. Offsets from "tokenize_with_offsets" are
+    shifted back onto the whole text.
+    """
+    units = deque()
+
+    def unit_texts():
+        for text in texts:
+            spans = split_units(text, max_unit_chars)
+            units.append(spans)
+            for start, end in spans:
+                yield text[start:end]
+
+    results = imap_segment(config, unit_texts(), n_jobs, chunksize, method, lexicon)
+    for first in results:
+        # a text's units are queued before the first of them is handed out
+        spans = units.popleft()
+        parts = [first] + [next(results) for _ in range(len(spans) - 1)]
+        if method == "tokenize_with_offsets":
+            yield [(w, s + shift, e + shift) for (shift, _), words in zip(spans, parts) for w, s, e in words]
+        else:
+            yield [item for part in parts for item in part]
@@ -0,0 +1,77 @@
+from typing import Dict, List, Tuple
+
+# === codepoint classes (mirror of SYLLABLE_BREAK_PATTERN in utils/patterns.py) ===
+OTHER = 0       # vowel signs, medials, tones ... never start a syllable
+CONSONANT = 1   # က-အ : starts a syllable unless stacked or killed
+STANDALONE = 2  # latin, digits, punctuation, independent vowels, whitespace
+U_VOWEL = 3     # ဥ : starts a syllable unless followed by athet
+A_THAT = 4      # U+103A
+SUBSCRIPT = 5   # U+1039
+DOT_BELOW = 6   # U+1037
+SPACE = 7       # U+0020 : syllable boundary, never part of a syllable
+
+
+def _build_class_table() -> Dict[str, int]:
+    table: Dict[str, int] = {}
+    for cp in range(0x3001):                       # every str.isspace() char lives below U+3001
+        if chr(cp).isspace():
+            table[chr(cp)] = STANDALONE
+    for cp in range(0x21, 0x7F):                   # printable ASCII
+        table[chr(cp)] = STANDALONE
+    for cp in range(0x1040, 0x104A):               # ၀-၉
+        table[chr(cp)] = STANDALONE
+    for ch in "ဣဤဦဧဩဪဿ၌၍၏၊။":
+        table[ch] = STANDALONE
+    for cp in range(0x1000, 0x1022):               # က-အ
+        table[chr(cp)] = CONSONANT
+    table["ဥ"] = U_VOWEL
+    table["်"] = A_THAT
+    table["္"] = SUBSCRIPT
+    table["့"] = DOT_BELOW
+    table[" "] = SPACE
+    return table
+
+
+CHAR_CLASS = _build_class_table()
+
+
+def syllable_spans(text: str) -> List[Tuple[int, int]]:
+    """
+    Finite-state syllable boundary detector.
+    Returns (start, end) offsets of every syllable in `text`; surrounding
+    whitespace is ignored and spaces only act as boundaries.
+    """
+    hi = len(text.rstrip())
+    lo = hi - len(text[:hi].lstrip())
+    get = CHAR_CLASS.get
+
+    spans: List[Tuple[int, int]] = []
+    start = -1
+    prev = OTHER
+    cls = get(text[lo], OTHER) if lo < hi else OTHER
+    for k in range(lo, hi):
+        nxt = get(text[k + 1], OTHER) if k + 1 < hi else OTHER
+        if cls == CONSONANT:
+            brk = prev != SUBSCRIPT and nxt != A_THAT and nxt != SUBSCRIPT and nxt != DOT_BELOW
+        elif cls == STANDALONE:
+            brk = True
+        elif cls == U_VOWEL:
+            brk = nxt != A_THAT
+        elif cls == SPACE:
+            if start >= 0:
+                spans.append((start, k))
+                start = -1
+            prev, cls = cls, nxt
+            continue
+        else:
+            brk = False
+
+        if brk or start < 0:
+            if start >= 0:
+                spans.append((start, k))
+            start = k
+        prev, cls = cls, nxt
+
+    if start >= 0:
+        spans.append((start, hi))
+    return spans
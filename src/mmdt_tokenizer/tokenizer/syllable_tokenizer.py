@@ -1,34 +1,76 @@
-import pandas as pd
-from typing import List, Union, Optional
+from typing import TYPE_CHECKING, Dict, List, Union, Optional
 
-from ..utils.data_utils import standardize_text_input
+if TYPE_CHECKING:
+    import pandas as pd
+
+from ..utils.data_utils import standardize_text_list, dedupe_batch, scatter_results
 from ..utils.csv_utils import save_tokens_to_csv
-from ..utils.patterns import SYLLABLE_BREAK_PATTERN
+from ..utils.cache import LRUCache, make_cache
+from .syllable_breaker import syllable_spans
 
 
 class MyanmarSyllableTokenizer:
     """Syllable-level tokenizer for Myanmar text."""
 
-    def __init__(self, separator=" "):
+    def __init__(self, separator=" ", cache: Union[int, LRUCache, None] = None):
         self.separator = separator
+        # opt-in result cache: a byte budget, or an LRUCache shared with other tokenizers
+        self.cache: Optional[LRUCache] = make_cache(cache)
+        # texts seen by deduplicated tokenize() batches, and how many were distinct
+        self.dedup_texts = 0
+        self.dedup_unique = 0
 
     def tokenize(
         self,
-        texts: Union[str, List[str], pd.Series, pd.DataFrame],
+        texts: Union[str, List[str], "pd.Series", "pd.DataFrame"],
         return_list=True,
         save_csv: Optional[str] = None,
         conll_style=True,
         column: Optional[str] = None,
+        dedup: Optional[bool] = None,
     ):
-        series = standardize_text_input(texts, column)
-        all_syllables = series.apply(self._break_one).tolist()
+        # identical texts are broken once (dedup=None: batches of DEDUP_MIN_BATCH or more)
+        texts, index = dedupe_batch(standardize_text_list(texts, column), dedup)
+        if index is not None:
+            self.dedup_texts += len(index)
+            self.dedup_unique += len(texts)
+        all_syllables = scatter_results(self.tokenize_batch(texts), index)
         if save_csv:
             save_tokens_to_csv(all_syllables, save_csv, conll_style)
 
         return all_syllables if return_list else [self.separator.join(syls) for syls in all_syllables]
 
+    def stats(self) -> Dict[str, object]:
+        """Batch deduplication counters, plus the result cache stats when it is on."""
+        stats: Dict[str, object] = {
+            "dedup_texts": self.dedup_texts,
+            "dedup_unique": self.dedup_unique,
+            "dedup_ratio": 1 - self.dedup_unique / self.dedup_texts if self.dedup_texts else 0.0,
+        }
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        return stats
+
+    def tokenize_one(self, text: str) -> List[str]:
+        """Syllables of a single string (plain-Python core, no pandas)."""
+        cache = self.cache
+        if cache is None:
+            return self._break_one(text)
+        key = ("syllable", text)
+        syllables = cache.get(key)
+        if syllables is None:
+            syllables = tuple(self._break_one(text))
+            cache.put(key, syllables)
+        return list(syllables)
+
+    def tokenize_batch(self, texts: List[str]) -> List[List[str]]:
+        """Syllables for each string in `texts` (plain-Python core, no pandas)."""
+        if self.cache is not None:
+            return [self.tokenize_one(text) for text in texts]
+        return [self._break_one(text) for text in texts]
+
+    def __reduce__(self):
+        return (self.__class__, (self.separator, self.cache.max_bytes if self.cache is not None else 0))
+
     def _break_one(self, text: str) -> List[str]:
-        segmented = SYLLABLE_BREAK_PATTERN.sub(self.separator + r"\1", text.strip())
-        tokens = segmented.lstrip(self.separator).split(self.separator)
-        cleaned_tokens = [tok for tok in tokens if tok] 
-        return cleaned_tokens
+        return [text[start:end] for start, end in syllable_spans(text)]
@@ -1,47 +1,113 @@
-import pandas as pd
-from typing import List, Union, Optional
+import threading
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple, Union, Optional
 
-from ..utils.data_utils import standardize_text_input
+if TYPE_CHECKING:
+    import pandas as pd
+    from ..utils.disk_cache import DiskCache
+    from ..rule_segmenter.user_lexicon import UserLexicon
+
+from ..utils.data_utils import standardize_text_list, dedupe_batch, scatter_results
 from ..utils.csv_utils import save_tokens_to_csv, save_tags_to_csv
 
 from .syllable_tokenizer import MyanmarSyllableTokenizer
-from ..rule_segmenter.engine import rule_segment
-from ..rule_segmenter.collapse import collapse_to_phrases
+from .parallel import imap_segment, imap_segment_units, publish_user_lexicon, resolve_n_jobs, DEFAULT_CHUNKSIZE
+from ..rule_segmenter.engine import rule_segment, rule_segment_buffer, rule_segment_with_offsets
+from ..rule_segmenter.engine import sizeof_phrase_entry
+from ..rule_segmenter.collapse import collapse_to_phrases, collapse_with_offsets
+from ..preprocessing.splitter import split_units, unit_start_before, unit_end_after, MAX_UNIT_CHARS
+from ..utils.cache import LRUCache, make_cache
+
+# Unchanged words of context needed on each side of a retokenize() window
+RETOKENIZE_CONTEXT_WORDS = 2
 
 
 def get_syllabus_from_tokenizer(tokenizer: MyanmarSyllableTokenizer):
     """Adapter: returns callable get_syllabus(text) -> List[str]."""
-    def get_syllabus(text: str) -> List[str]:
-        lists = tokenizer.tokenize(text, return_list=True)
-        if not lists:
-            return []
-        return lists[0] if isinstance(lists[0], list) else lists
-    return get_syllabus
+    return tokenizer.tokenize_one
 
 class MyanmarWordTokenizer:
     """Word-level tokenizer using syllable segmentation + rule-based segmentation."""
 
-    def __init__(self, protect_pattern :bool = True):
+    def __init__(self, protect_pattern :bool = True, engine: str = "trie",
+                 split_sentences: bool = False, max_unit_chars: int = MAX_UNIT_CHARS,
+                 cache: Union[int, LRUCache, None] = None,
+                 phrase_memo: Union[int, LRUCache, None] = None,
+                 disk_cache: Union[str, "DiskCache", None] = None,
+                 dictionaries: Sequence[str] = (),
+                 lexicon_entries: Sequence[Tuple[Tuple[str, ...], Tuple[str, ...]]] = ()):
         
         self.protect_pattern:bool = protect_pattern
+        self.engine: str = engine   # "trie" or "aho_corasick"
+        # compiled external dictionaries (see compile_lexicon), memory-mapped and shared by every process
+        self.dictionaries: Tuple[str, ...] = tuple(dictionaries)
+        self._lexicons = ()
+        if self.dictionaries:
+            from ..rule_segmenter.mapped_lexicon import open_mapped_lexicon
+            self._lexicons = tuple(open_mapped_lexicon(path) for path in self.dictionaries)
+        # runtime edits of the bundled lexicons (see add_entries), swapped whole on every update
+        self._user_lexicon: Optional["UserLexicon"] = None
+        self._edit_lock = threading.Lock()
+        if lexicon_entries:
+            from ..rule_segmenter.user_lexicon import edit_lexicon
+            self._user_lexicon = edit_lexicon(None, dict(lexicon_entries))
+        # segment each text as independent sentence units (see split_units)
+        self.split_sentences: bool = split_sentences
+        self.max_unit_chars: int = max_unit_chars
+        # opt-in result cache: a byte budget, or an LRUCache shared with other tokenizers
+        self.cache: Optional[LRUCache] = make_cache(cache)
+        self._cache_namespace = self._namespace()
+        # opt-in memo of recently seen phrases' syllables and lexicon chunks: a byte budget
+        # (see PHRASE_MEMO_BYTES), or an LRUCache shared with other tokenizers
+        self.phrase_memo: Optional[LRUCache] = make_cache(phrase_memo, sizeof_phrase_entry)
+        # opt-in persistent cache of tokenize() results: an SQLite file path or a DiskCache
+        self.disk_cache: Optional["DiskCache"] = None
+        if disk_cache is not None:
+            from ..utils.disk_cache import open_disk_cache  # sqlite3 is only imported when used
+            self.disk_cache = open_disk_cache(disk_cache)
+        # texts seen by deduplicated tokenize() batches, and how many were distinct
+        self.dedup_texts = 0
+        self.dedup_unique = 0
         self.syllable_tokenizer = MyanmarSyllableTokenizer()
         self._get_syllabus = get_syllabus_from_tokenizer(self.syllable_tokenizer)
 
     def tokenize(
         self,
-        texts: Union[str, List[str], pd.Series, pd.DataFrame],
+        texts: Union[str, List[str], "pd.Series", "pd.DataFrame"],
         return_list=True,
         separator=" ",
         save_csv: Optional[str] = None,
         save_tag: Optional[str] = None,
         conll_style=True,
         column: Optional[str] = None,
+        n_jobs: int = 1,
+        chunksize: Optional[int] = None,
+        dedup: Optional[bool] = None,
     ):
         
-        series = standardize_text_input(texts, column)
-        token_tag_pairs = series.apply(self._tokenize_one).tolist()
-        
-        all_tokens = collapse_to_phrases(token_tag_pairs)
+        # identical texts are tokenized once and their results scattered back
+        # (dedup=None: only for batches of DEDUP_MIN_BATCH texts or more)
+        texts, index = dedupe_batch(standardize_text_list(texts, column), dedup)
+        if index is not None:
+            self.dedup_texts += len(index)
+            self.dedup_unique += len(texts)
+        # one lexicon snapshot for the whole call, edits on other threads notwithstanding
+        user_lexicon = self._user_lexicon
+        if self.disk_cache is not None and not save_tag:
+            # texts already tokenized by an earlier run are read back from disk
+            results = self.disk_cache.map(self._disk_namespace(user_lexicon), texts,
+                                          lambda todo: self._tokenize_texts(todo, False, n_jobs, chunksize,
+                                                                            user_lexicon))
+        else:
+            results = self._tokenize_texts(texts, save_tag, n_jobs, chunksize, user_lexicon)
+        results = scatter_results(results, index)
+
+        if save_tag:
+            token_tag_pairs = results
+            all_tokens = collapse_to_phrases(token_tag_pairs)
+        else:
+            all_tokens = results
         
         if save_csv:
             save_tokens_to_csv(all_tokens, save_csv, conll_style)
@@ -52,8 +118,258 @@ class MyanmarWordTokenizer:
 
         return all_tokens if return_list else [separator.join(toks) for toks in all_tokens]
     
+    def _tokenize_texts(self, texts: List[str], save_tag, n_jobs: int, chunksize: Optional[int],
+                        user_lexicon: Optional["UserLexicon"]) -> list:
+        processes = resolve_n_jobs(n_jobs)
+        method = "_tokenize_one" if save_tag else "tokenize_one"
+        if processes > 1 and self.split_sentences:
+            n_units = len(texts) + sum(map(len, texts)) // self.max_unit_chars
+            chunksize = chunksize or max(1, min(DEFAULT_CHUNKSIZE, n_units // (4 * processes)))
+            return list(imap_segment_units(self._unit_config(), texts, processes, self.max_unit_chars,
+                                           chunksize, method, publish_user_lexicon(user_lexicon)))
+        if processes > 1:
+            chunksize = chunksize or max(1, min(DEFAULT_CHUNKSIZE, len(texts) // (4 * processes)))
+            return list(imap_segment(self._base_config(), texts, processes, chunksize, method,
+                                     publish_user_lexicon(user_lexicon)))
+        if save_tag:
+            return [self._chunks(text, user_lexicon) for text in texts]
+        return self._tokenize_batch(texts, user_lexicon)
+
+    def stats(self) -> Dict[str, object]:
+        """Batch deduplication counters, plus the stats of each cache that is on."""
+        stats: Dict[str, object] = {
+            "dedup_texts": self.dedup_texts,
+            "dedup_unique": self.dedup_unique,
+            "dedup_ratio": 1 - self.dedup_unique / self.dedup_texts if self.dedup_texts else 0.0,
+        }
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        if self.phrase_memo is not None:
+            stats["phrase_memo"] = self.phrase_memo.stats()
+        if self.disk_cache is not None:
+            stats["disk_cache"] = self.disk_cache.stats()
+        return stats
+
+    def add_entries(self, entries: Mapping[Union[str, Tuple[str, ...]], str]) -> None:
+        """
+        Add {syllables: tag} lexicon entries without a rebuild. The tag must be
+        one of the PIPELINE's; an entry the bundled lexicons already have keeps
+        its tags too, ranked in PIPELINE order. Calls on other threads see the
+        lexicons wholly before or wholly after the update. With the
+        "aho_corasick" engine the automaton of the edited lexicons is built on
+        first use after each update.
+        """
+        from ..rule_segmenter.user_lexicon import add_entries
+        with self._edit_lock:
+            self._set_user_lexicon(add_entries(self._user_lexicon, entries))
+
+    def remove_entries(self, entries: Iterable[Union[str, Tuple[str, ...]]]) -> None:
+        """Remove lexicon entries (bundled or added) under all their tags; see add_entries."""
+        from ..rule_segmenter.user_lexicon import remove_entries
+        with self._edit_lock:
+            self._set_user_lexicon(remove_entries(self._user_lexicon, entries))
+
+    def lexicon_entries(self) -> Dict[Tuple[str, ...], Tuple[str, ...]]:
+        """Entries whose tags differ from the bundled lexicons (empty tags: removed)."""
+        user_lexicon = self._user_lexicon
+        return dict(user_lexicon.entries) if user_lexicon is not None else {}
+
+    def _set_user_lexicon(self, user_lexicon: Optional["UserLexicon"]) -> None:
+        # the new trie is complete before it is published; every call reads the
+        # reference once and keys its cached results by that snapshot's edits
+        self._user_lexicon = user_lexicon
+
+    def tokenize_one(self, text: str) -> List[str]:
+        """Words of a single string (plain-Python core, no pandas)."""
+        return self._cached_words(text, self._user_lexicon)
+
+    def _cached_words(self, text: str, user_lexicon: Optional["UserLexicon"]) -> List[str]:
+        cache = self.cache
+        if cache is None:
+            return self._words(text, user_lexicon)
+        key = (self._cache_namespace, user_lexicon.fingerprint if user_lexicon is not None else None, text)
+        words = cache.get(key)
+        if words is None:
+            words = tuple(self._words(text, user_lexicon))
+            cache.put(key, words)
+        return list(words)
+
+    def tokenize_batch(self, texts: List[str]) -> List[List[str]]:
+        """Words for each string in `texts` (plain-Python core, no pandas)."""
+        return self._tokenize_batch(texts, self._user_lexicon)
+
+    def _tokenize_batch(self, texts: List[str], user_lexicon: Optional["UserLexicon"]) -> List[List[str]]:
+        if self.split_sentences or self.cache is not None:
+            return [self._cached_words(text, user_lexicon) for text in texts]
+        return collapse_to_phrases([self._segment(text, user_lexicon) for text in texts])
+
+    def _words(self, text: str, user_lexicon: Optional["UserLexicon"]) -> List[str]:
+        if self.split_sentences:
+            return [w for words in collapse_to_phrases(self._segment_units(text, user_lexicon)) for w in words]
+        return collapse_to_phrases([self._segment(text, user_lexicon)])[0]
+
+    def tokenize_with_offsets(self, text: str, n_jobs: int = 1) -> List[Tuple[str, int, int]]:
+        """
+        (word, start, end) for each word of `text`; offsets index the original string.
+        With split_sentences and n_jobs > 1 the units of `text` are segmented on the pool;
+        without it one text is one task, so n_jobs must be 1 (see itokenize for batches).
+        """
+        user_lexicon = self._user_lexicon
+        if not self.split_sentences:
+            if n_jobs != 1:
+                raise ValueError("n_jobs needs split_sentences=True; use itokenize() to spread texts over a pool")
+            return self._words_with_offsets(text, user_lexicon)
+        if resolve_n_jobs(n_jobs) > 1:
+            return next(imap_segment_units(self._unit_config(), [text], n_jobs, self.max_unit_chars,
+                                           1, "tokenize_with_offsets", publish_user_lexicon(user_lexicon)))
+        return [(w, start + shift, end + shift) for shift, stop in split_units(text, self.max_unit_chars)
+                for w, start, end in self._words_with_offsets(text[shift:stop], user_lexicon)]
+
+    def retokenize(self, text: str, words: List[Tuple[str, int, int]], offset: int, deleted: int,
+                   inserted: str) -> Tuple[str, List[Tuple[str, int, int]]]:
+        """
+        Apply an edit to `text` (replace `deleted` characters at `offset` with
+        `inserted`) and update `words`, its tokenize_with_offsets() result.
+
+        Only the sentences around the edit are segmented again, together with one
+        sentence of context on each side; the context must come out as before,
+        or the window grows a sentence at a time. With split_sentences, the
+        units (see split_units) that changed are segmented again instead.
+        Returns the new text and words.
+        """
+        new_text = text[:offset] + inserted + text[offset + deleted:]
+        delta = len(inserted) - deleted
+        user_lexicon = self._user_lexicon
+        if self.split_sentences:
+            return new_text, self._retokenize_units(text, new_text, words, offset, len(inserted), delta,
+                                                    user_lexicon)
+        size = self.max_unit_chars
+        lo, hi = offset, offset + len(inserted)
+        while True:
+            lo, hi = unit_start_before(new_text, lo, size), unit_end_after(new_text, hi, size)
+            start, end = unit_start_before(new_text, lo, size), unit_end_after(new_text, hi, size)
+            window = [(w, s + start, e + start) for w, s, e in
+                      self._words_with_offsets(new_text[start:end], user_lexicon)]
+            if start == 0 and end == len(new_text):
+                return new_text, window
+            # old words before lo keep their offsets, those after hi move by delta
+            left, right = bisect_right(words, lo, key=itemgetter(2)), bisect_left(words, hi - delta, key=itemgetter(1))
+            old_left = words[bisect_left(words, start, key=itemgetter(1)):left]
+            old_right = [(w, s + delta, e + delta) for w, s, e in
+                         words[right:bisect_right(words, end - delta, key=itemgetter(2))]]
+            a, b = len(old_left), len(window) - len(old_right)
+            # the context must hold RETOKENIZE_CONTEXT_WORDS on each side (bar the text's ends),
+            # no old word may straddle lo or hi, and the new ones must stay between them
+            if ((a >= RETOKENIZE_CONTEXT_WORDS or start == 0)
+                    and (len(window) - b >= RETOKENIZE_CONTEXT_WORDS or end == len(new_text))
+                    and a <= b and window[:a] == old_left and window[b:] == old_right
+                    and all(s >= lo and e <= hi for _, s, e in window[a:b])
+                    and (left == len(words) or words[left][1] >= lo)
+                    and (right == 0 or words[right - 1][2] <= hi - delta)):
+                return new_text, words[:left] + window[a:b] + [(w, s + delta, e + delta) for w, s, e in words[right:]]
+
+    def _retokenize_units(self, text: str, new_text: str, words: List[Tuple[str, int, int]], offset: int,
+                          inserted: int, delta: int,
+                          user_lexicon: Optional["UserLexicon"]) -> List[Tuple[str, int, int]]:
+        # a cut moved by the edit can shift every later cut, so units are matched
+        # to the old ones by position; the words of a unit depend on its text alone
+        old_units = set(split_units(text, self.max_unit_chars))
+        new_words: List[Tuple[str, int, int]] = []
+        for start, end in split_units(new_text, self.max_unit_chars):
+            if end <= offset and (start, end) in old_units:
+                shift = 0
+            elif start >= offset + inserted and (start - delta, end - delta) in old_units:
+                shift = delta
+            else:
+                new_words.extend((w, s + start, e + start) for w, s, e in
+                                 self._words_with_offsets(new_text[start:end], user_lexicon))
+                continue
+            lo = bisect_left(words, start - shift, key=itemgetter(1))
+            hi = bisect_left(words, end - shift, key=itemgetter(1))
+            new_words.extend(words[lo:hi] if not shift else [(w, s + shift, e + shift) for w, s, e in words[lo:hi]])
+        return new_words
+
+    def itokenize(self, texts: Iterable[str], n_jobs: int = 1,
+                  chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[List[str]]:
+        """
+        imap-style lazy iterator: yields the words of each text in input order.
+        With n_jobs > 1 (or -1 for all cores) work goes to a persistent process pool.
+        """
+        user_lexicon = self._user_lexicon
+        if resolve_n_jobs(n_jobs) == 1:
+            return (self._cached_words(text, user_lexicon) for text in texts)
+        if self.split_sentences:
+            return imap_segment_units(self._unit_config(), texts, n_jobs, self.max_unit_chars, chunksize,
+                                      lexicon=publish_user_lexicon(user_lexicon))
+        return imap_segment(self._base_config(), texts, n_jobs, chunksize, lexicon=publish_user_lexicon(user_lexicon))
+
+    def _config(self):
+        # (the disk cache stays with the parent, which does all its lookups)
+        return self._base_config()[:-1] + (tuple(sorted(self.lexicon_entries().items())),)
+
+    def _base_config(self):
+        # pools get the runtime edits separately (see publish_user_lexicon), so
+        # tasks stay small and a worker keeps its tokenizer across edits
+        return (self.protect_pattern, self.engine, self.split_sentences, self.max_unit_chars,
+                self.cache.max_bytes if self.cache is not None else 0,
+                self.phrase_memo.max_bytes if self.phrase_memo is not None else 0,
+                None, self.dictionaries, ())
+
+    def _namespace(self) -> tuple:
+        # the runtime edits are part of each cache key instead (see _cached_words)
+        return ("word", self.protect_pattern, self.engine, self.split_sentences, self.max_unit_chars,
+                tuple(lexicon.fingerprint for lexicon in self._lexicons))
+
+    def _disk_namespace(self, user_lexicon: Optional["UserLexicon"]):
+        # stored words are only valid for this configuration and these lexicons and rules
+        from ..utils.disk_cache import source_fingerprint
+        fingerprints = tuple(lexicon.fingerprint for lexicon in self._lexicons)
+        if user_lexicon is not None:
+            fingerprints += (user_lexicon.fingerprint,)
+        return ("word", source_fingerprint(), self.protect_pattern, self.engine,
+                self.split_sentences, self.max_unit_chars, fingerprints)
+
+    def _unit_config(self):
+        # workers get units that are already split (and whole texts are cached here)
+        return (self.protect_pattern, self.engine, False, self.max_unit_chars, None,
+                self.phrase_memo.max_bytes if self.phrase_memo is not None else 0,
+                None, self.dictionaries, ())
+
+    def __reduce__(self):
+        # pickle as a tiny configuration record; the shared lexicon tries are
+        # module-level and re-attached on import in the receiving process,
+        # external dictionaries are mapped again from their files and runtime
+        # edits are replayed onto them
+        return (self.__class__, self._config())
+
+    def _segment(self, text: str, user_lexicon: Optional["UserLexicon"]):
+        # chunks as a ChunkBuffer; only the words are needed, so no Chunk objects are built
+        return rule_segment_buffer(text, self.protect_pattern, get_syllabus=self._get_syllabus,
+                                   engine=self.engine, memo=self.phrase_memo, lexicons=self._lexicons,
+                                   user_lexicon=user_lexicon)
+
+    def _segment_units(self, text: str, user_lexicon: Optional["UserLexicon"]):
+        return [self._segment(text[start:end], user_lexicon) for start, end in split_units(text, self.max_unit_chars)]
+
+    def _words_with_offsets(self, text: str, user_lexicon: Optional["UserLexicon"]) -> List[Tuple[str, int, int]]:
+        chunks, token_offsets = rule_segment_with_offsets(text, self.protect_pattern, get_syllabus=self._get_syllabus,
+                                                          engine=self.engine, lexicons=self._lexicons,
+                                                          user_lexicon=user_lexicon)
+        return collapse_with_offsets(chunks, token_offsets)
+
     def _tokenize_one(self, text: str):
-        token_tag_paris = rule_segment(text, self.protect_pattern, get_syllabus=self._get_syllabus)
+        return self._chunks(text, self._user_lexicon)
+
+    def _chunks(self, text: str, user_lexicon: Optional["UserLexicon"]):
+        if self.split_sentences:
+            # chunk spans index the syllable tokens of their own unit
+            return [chunk for start, end in split_units(text, self.max_unit_chars)
+                    for chunk in rule_segment(text[start:end], self.protect_pattern, get_syllabus=self._get_syllabus,
+                                              engine=self.engine, memo=self.phrase_memo, lexicons=self._lexicons,
+                                              user_lexicon=user_lexicon)]
+        token_tag_paris = rule_segment(text, self.protect_pattern, get_syllabus=self._get_syllabus,
+                                       engine=self.engine, memo=self.phrase_memo, lexicons=self._lexicons,
+                                       user_lexicon=user_lexicon)
         
         return token_tag_paris
 
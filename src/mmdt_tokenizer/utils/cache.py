@@ -0,0 +1,80 @@
+import sys
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Sequence, Union
+
+# Bytes charged per entry for the dict node and the (value, size) pair
+ENTRY_OVERHEAD = 120
+
+
+def sizeof_tokens(tokens: Sequence[str]) -> int:
+    """Approximate bytes held by a token sequence and its strings."""
+    return sys.getsizeof(tokens) + sum(map(sys.getsizeof, tokens))
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache of token sequences, bounded by the
+    approximate bytes of its texts and values rather than by entry count.
+    Keys are (namespace, text) pairs so one cache can be shared by tokenizers
+    with different configurations; `sizeof` measures other kinds of value.
+    """
+
+    def __init__(self, max_bytes: int, sizeof: Callable[[tuple], int] = sizeof_tokens):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[tuple]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: tuple) -> None:
+        size = sys.getsizeof(key[-1]) + self.sizeof(value) + ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._data[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._data.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "entries": len(self._data), "bytes": self.bytes, "max_bytes": self.max_bytes}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __reduce__(self):
+        # locks do not pickle; a copy sent to a worker starts empty
+        return (self.__class__, (self.max_bytes, self.sizeof))
+
+
+def make_cache(cache: Union[int, LRUCache, None], sizeof: Callable[[tuple], int] = sizeof_tokens) -> Optional[LRUCache]:
+    """A tokenizer's `cache` argument: a byte budget (0 or None = off) or a cache to share."""
+    if isinstance(cache, LRUCache):
+        return cache
+    return LRUCache(cache, sizeof) if cache else None
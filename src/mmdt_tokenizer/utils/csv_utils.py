@@ -1,8 +1,9 @@
-import pandas as pd
 from typing import List, Union
 
 def save_tokens_to_csv(tokens: Union[List[str], List[List[str]]], save_csv: str, conll_style: bool = True):
     """Save tokenized text to CSV (CoNLL-style or sentence-per-row)."""
+    import pandas as pd
+
     if not tokens:
         sublists = []
     elif isinstance(tokens[0], list):
@@ -31,6 +32,8 @@ def save_tokens_to_csv(tokens: Union[List[str], List[List[str]]], save_csv: str,
 
     
 def save_tags_to_csv(chunks, save_csv_filename):
+    import pandas as pd
+
     if chunks and isinstance(chunks[0], list):
         flat_chunks = [ch for sent in chunks for ch in sent]
     elif chunks:
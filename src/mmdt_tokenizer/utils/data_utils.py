@@ -1,11 +1,19 @@
-import pandas as pd
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
-def standardize_text_input(texts, column=None) -> pd.Series:
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Batches of at least this many texts are deduplicated before tokenizing by default
+DEDUP_MIN_BATCH = 64
+
+def standardize_text_input(texts, column=None) -> "pd.Series":
     """
     Convert input of various types (DataFrame, Series, list, str) into
     a pandas Series of strings. 
     None values are replaced with empty strings.
     """
+    import pandas as pd
+
     if texts is None:
         raise ValueError("Input 'texts' cannot be None")
 
@@ -28,3 +36,36 @@ def standardize_text_input(texts, column=None) -> pd.Series:
     else:
         raise TypeError(f"Unsupported input type: {type(texts)}")
 
+
+def standardize_text_list(texts, column=None) -> List[str]:
+    """
+    Same contract as standardize_text_input, but returns a plain list of strings.
+    str and list inputs never touch pandas (or import it); only DataFrame/Series go through it.
+    """
+    if isinstance(texts, str):
+        return [texts]
+
+    if isinstance(texts, list):
+        return [(str(t) if t is not None else "") for t in texts]
+
+    return standardize_text_input(texts, column).tolist()
+
+
+def dedupe_batch(texts: List[str], dedup: Optional[bool] = None) -> Tuple[List[str], Optional[List[int]]]:
+    """
+    The distinct texts of a batch in first-seen order, and each input's position
+    among them; (texts, None) when not deduplicating. dedup=None deduplicates
+    batches of DEDUP_MIN_BATCH texts or more.
+    """
+    if not (dedup if dedup is not None else len(texts) >= DEDUP_MIN_BATCH):
+        return texts, None
+    slots: Dict[str, int] = {}
+    index = [slots.setdefault(text, len(slots)) for text in texts]
+    return list(slots), index
+
+
+def scatter_results(results: list, index: Optional[List[int]]) -> list:
+    """Undo dedupe_batch: one result per input text, each its own list."""
+    if index is None:
+        return results
+    return [list(results[k]) for k in index]
@@ -0,0 +1,185 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple, Union
+
+# Default size bound of a disk cache (bytes of keys and stored tokens)
+DISK_CACHE_BYTES = 1 << 30
+# Bytes charged per row on top of its key and value
+ROW_OVERHEAD = 40
+# Pruning stops once the cache is back under this fraction of max_bytes
+PRUNE_TO = 0.9
+# Keys per SELECT, below SQLite's bound-variable limit
+_BATCH = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tokens (
+    key BLOB PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    used REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tokens_used ON tokens (used);
+"""
+
+
+@lru_cache(maxsize=None)
+def source_fingerprint() -> str:
+    """
+    Hash of the package version and of every module of the package, so that
+    any change to the lexicons, patterns or rules gives new cache keys.
+    """
+    root = Path(__file__).resolve().parent.parent
+    digest = hashlib.sha1()
+    try:
+        from importlib.metadata import version
+        digest.update(version("mmdt-tokenizer").encode())
+    except Exception:
+        pass
+    for path in sorted(root.rglob("*.py")):
+        digest.update(str(path.relative_to(root)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """
+    Persistent cache of token sequences in an SQLite file, shared across runs.
+
+    Rows are keyed by a hash of the tokenizer's namespace (its configuration and
+    fingerprint) and the text, so entries written under other rules are never
+    read back; they age out with the least recently used rows once the file
+    passes `max_bytes`, or after `max_age` seconds unused.
+    """
+
+    def __init__(self, path: Union[str, Path], max_bytes: int = DISK_CACHE_BYTES,
+                 max_age: Optional[float] = None):
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self.bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM tokens").fetchone()[0]
+        self.prune()
+
+    @staticmethod
+    def key(namespace: Hashable, text: str) -> bytes:
+        digest = hashlib.sha1(repr(namespace).encode())
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8", "surrogatepass"))
+        return digest.digest()
+
+    def get_many(self, keys: Sequence[bytes]) -> Dict[bytes, List[str]]:
+        """Stored tokens of the keys that are present; marks them as used."""
+        found: Dict[bytes, List[str]] = {}
+        with self._lock:
+            for i in range(0, len(keys), _BATCH):
+                batch = keys[i:i + _BATCH]
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM tokens WHERE key IN ({','.join('?' * len(batch))})", batch)
+                found.update((key, json.loads(value)) for key, value in rows)
+            if found:
+                now = time.time()
+                self._conn.executemany("UPDATE tokens SET used = ? WHERE key = ?", ((now, k) for k in found))
+                self._conn.commit()
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: Iterable[Tuple[bytes, Sequence[str]]]) -> None:
+        now = time.time()
+        rows = {}
+        for key, tokens in items:
+            value = json.dumps(list(tokens), ensure_ascii=False)
+            rows[key] = (key, value, len(key) + len(value.encode("utf-8", "surrogatepass")) + ROW_OVERHEAD, now)
+        if not rows:
+            return
+        keys = list(rows)
+        with self._lock:
+            # rows replaced by this write (e.g. by another process sharing the file) no longer count
+            replaced = 0
+            for i in range(0, len(keys), _BATCH):
+                batch = keys[i:i + _BATCH]
+                replaced += self._conn.execute(
+                    f"SELECT COALESCE(SUM(size), 0) FROM tokens WHERE key IN ({','.join('?' * len(batch))})",
+                    batch).fetchone()[0]
+            self._conn.executemany("INSERT OR REPLACE INTO tokens VALUES (?, ?, ?, ?)", rows.values())
+            self._conn.commit()
+            self.bytes += sum(row[2] for row in rows.values()) - replaced
+        if self.bytes > self.max_bytes:
+            self.prune()
+
+    def map(self, namespace: Hashable, texts: List[str],
+            compute: Callable[[List[str]], List[List[str]]]) -> List[List[str]]:
+        """Tokens of each text: stored ones are read back, `compute` runs on the rest once."""
+        keys = [self.key(namespace, text) for text in texts]
+        found = self.get_many(keys)
+        missing = [i for i, key in enumerate(keys) if key not in found]
+        if not missing:
+            return [found[key] for key in keys]
+        computed = compute([texts[i] for i in missing])
+        self.put_many((keys[i], tokens) for i, tokens in zip(missing, computed))
+        results = [found.get(key) for key in keys]
+        for i, tokens in zip(missing, computed):
+            results[i] = tokens
+        return results
+
+    def prune(self) -> None:
+        """Drop rows unused for max_age seconds, then the least recently used ones over max_bytes."""
+        with self._lock:
+            conn = self._conn
+            removed = 0
+            if self.max_age is not None:
+                removed += conn.execute("DELETE FROM tokens WHERE used < ?", (time.time() - self.max_age,)).rowcount
+            if removed:
+                self.bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM tokens").fetchone()[0]
+            if self.bytes > self.max_bytes:
+                excess = self.bytes - int(self.max_bytes * PRUNE_TO)
+                stale = []
+                for key, size in conn.execute("SELECT key, size FROM tokens ORDER BY used"):
+                    stale.append((key,))
+                    excess -= size
+                    if excess <= 0:
+                        break
+                conn.executemany("DELETE FROM tokens WHERE key = ?", stale)
+                removed += len(stale)
+                self.bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM tokens").fetchone()[0]
+            conn.commit()
+            self.evictions += removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM tokens")
+            self._conn.commit()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM tokens").fetchone()[0]
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "entries": entries, "bytes": self.bytes, "max_bytes": self.max_bytes, "path": self.path}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __reduce__(self):
+        # connections do not pickle; the copy opens the same file
+        return (self.__class__, (self.path, self.max_bytes, self.max_age))
+
+
+def open_disk_cache(disk_cache: Union[str, Path, DiskCache, None]) -> Optional[DiskCache]:
+    """A tokenizer's `disk_cache` argument: a file path (None = off) or an open DiskCache to share."""
+    if disk_cache is None or isinstance(disk_cache, DiskCache):
+        return disk_cache
+    return DiskCache(disk_cache)
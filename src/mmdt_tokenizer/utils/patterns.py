@@ -74,6 +74,24 @@ TAG_PATTERNS = {
     "URL": [URL_PATTERN]
 }
 
+# Characters a TAG_PATTERNS match can start with: a cheap pre-check so that most
+# syllables never reach the tag regexes
+NUMBER_WORD_FIRST = "တနသလငခရကဆထ"
+TAG_FIRST_CHARS = {
+    NUMBER_PATTERN: re.compile(r'[\d၀-၉]'),
+    PHONE_NUM_PATTERN: re.compile(r'[+09၀]'),
+    WORD_NUM_PATTERN: re.compile(f'[{NUMBER_WORD_FIRST}]'),
+    ABB_BUR_PATTERN_1: re.compile(r'[က-အ]'),
+    ABB_BUR_PATTERN_2: re.compile(r'[\u1000-\u1021]'),
+    ABB_ENG_PATTERN: re.compile(r'[A-Za-z]'),
+    PER_NAME_PATTERN: re.compile(r'@'),
+    DATE_PATTERN_01: re.compile(r'[0-9\u1040-\u1049]'),
+    DATE_PATTERN_02: re.compile(f'[0-9\u1040-\u1049{NUMBER_WORD_FIRST}]'),
+    TIME_PATTERN: re.compile(r'[0-9\u1040-\u1049]'),
+    EMAIL_PATTERN: re.compile(r'[A-Za-z0-9\u1040-\u1049._%+\-]'),
+    URL_PATTERN: re.compile(r'[hw]'),
+}
+
 
 PROTECT_PATTERNS =[
     EMAIL_PATTERN, # email address
@@ -91,8 +109,115 @@ PROTECT_PATTERNS =[
     NUMBER_PATTERN # Any Number
 ]
 
+# Kind recorded for every protected span, per protection pattern
+PROTECT_KINDS = {
+    EMAIL_PATTERN: "EMAIL",
+    URL_PATTERN: "URL",
+    PER_NAME_PATTERN: "NAME",
+    ABB_ENG_PATTERN: "ABB_ENG",
+    TITLE_PATTERN: "TITLE",
+    ABB_BUR_PATTERN_1: "ABB_BUR",
+    ABB_BUR_PATTERN_2: "ABB_BUR",
+    DATE_PATTERN_01: "DATE",
+    DATE_PATTERN_02: "DATE",
+    TIME_PATTERN: "TIME",
+    DEC_NUM_PATTERN: "DEC_NUM",
+    LONG_NUM_PATTERN: "LONG_NUM",
+    FRC_NUM_PATTERN: "FRC_NUM",
+    PHONE_NUM_PATTERN: "PHONE",
+    POSSESIVE_PATTERN: "POSSESSIVE",
+    WORD_NUM_PATTERN: "WORDNUM",
+    NUMBER_PATTERN: "NUM",
+}
+
+# Cheap profile of a text, computed once before protection: which of these
+# character classes, and which of these literal words, occur in it
+PROFILE_CHARS = {
+    "AT": "@",
+    "LATIN": "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz",
+    "DIGIT": "0123456789\u1040\u1041\u1042\u1043\u1044\u1045\u1046\u1047\u1048\u1049",
+    "DOT": ".",
+    "NUMSEP": ".,",
+    "SEP": "./-",
+    "SLASH": "/",
+    "COLON": ":",
+    "APOS": "'",
+}
+PROFILE_SCAN_PATTERN = re.compile("[" + re.escape("".join(sorted(set("".join(PROFILE_CHARS.values()))))) + "]")
+RE_MM_CONSONANT = re.compile(r'[\u1000-\u1021]')  # "CONSONANT": too frequent to collect one by one
+MONTH_WORDS = ("ဇန်နဝါရီ", "ဖေဖော်ဝါရီ", "မတ်", "ဧပြီ", "မေ", "ဇွန်", "ဇူလိုင်", "ဩဂုတ်", "အောဂုတ်",
+               "စက်တင်ဘာ", "အောက်တိုဘာ", "နိုဝင်ဘာ", "ဒီဇင်ဘာ")
+PROFILE_WORDS = {
+    "URL": ("http", "www."),
+    "MONTH": MONTH_WORDS,
+}
+
+# Profile entries a text needs before each protection pattern can match in it
+# ("LEADING_DIGIT": NUMBER_PATTERN is anchored, so the text must start with a \d digit)
+PROTECT_TRIGGERS = {
+    EMAIL_PATTERN: ("AT",),
+    URL_PATTERN: ("URL",),
+    PER_NAME_PATTERN: ("AT",),
+    ABB_ENG_PATTERN: ("LATIN",),
+    TITLE_PATTERN: ("LATIN", "DOT"),
+    ABB_BUR_PATTERN_1: ("CONSONANT", "SEP"),
+    ABB_BUR_PATTERN_2: ("CONSONANT",),
+    DATE_PATTERN_01: ("DIGIT", "SEP"),
+    DATE_PATTERN_02: ("MONTH",),
+    TIME_PATTERN: ("DIGIT", "COLON"),
+    DEC_NUM_PATTERN: ("DIGIT", "DOT"),
+    LONG_NUM_PATTERN: ("DIGIT", "NUMSEP"),
+    FRC_NUM_PATTERN: ("DIGIT", "SLASH"),
+    PHONE_NUM_PATTERN: ("DIGIT",),
+    POSSESIVE_PATTERN: ("APOS", "LATIN"),
+    WORD_NUM_PATTERN: ("CONSONANT",),
+    NUMBER_PATTERN: ("LEADING_DIGIT",),
+}
+
+# Protection patterns that open with an unbounded run (digits, number words, the
+# local part of an email) retry the whole run from every position inside it when
+# the rest does not match, which is quadratic in the run length. A match starting
+# inside such a run implies one at the run's start, so these twins only try run
+# starts; find_protected_spans scans with them instead of the originals.
+_DIGIT_RUN_START = r'(?<![0-9\u1040-\u1049])'
+
+
+def _date_02_run_start() -> re.Pattern:
+    # the digit and number-word branches each need their own guard
+    source = DATE_PATTERN_02.pattern
+    head = r'(?:[0-9\u1040-\u1049]+|(?:'
+    assert source.startswith(head)
+    words = source[len(head):source.index(')+)')].split("|")
+    word_guard = "".join(f"(?<!{w})" for w in words)
+    return re.compile(r'(?:' + _DIGIT_RUN_START + r'[0-9\u1040-\u1049]+|' + word_guard + r'(?:'
+                      + source[len(head):], DATE_PATTERN_02.flags)
+
+
+RUN_START_PATTERNS = {
+    EMAIL_PATTERN: re.compile(r'(?<![A-Za-z0-9\u1040-\u1049._%+\-])' + EMAIL_PATTERN.pattern),
+    DATE_PATTERN_02: _date_02_run_start(),
+    DEC_NUM_PATTERN: re.compile(_DIGIT_RUN_START + DEC_NUM_PATTERN.pattern),
+    LONG_NUM_PATTERN: re.compile(_DIGIT_RUN_START + LONG_NUM_PATTERN.pattern),
+    FRC_NUM_PATTERN: re.compile(_DIGIT_RUN_START + FRC_NUM_PATTERN.pattern),
+}
+
+# Text cleaning (preprocessing)
+RE_SPECIAL_CHARS = re.compile(r"[~^*_+=<>\[\]{}|\\…“”‘’「」『』\"'#()]+|\.\.+")
+RE_GHOST_CHARS = re.compile(r'[\u200B\u200C\u200D\uFEFF]')
+RE_SPACES = re.compile(r'\s+')
+# One phrase token outside protected spans: a PUNCT_PATTERN character on its own, or
+# a run of anything else (spaces and the dropped punctuation "-:/" separate tokens)
+PHRASE_TOKEN_PATTERN = re.compile(
+    r'[\u104A\u104B.,;\(\)\[\]\{\}%\\\u2010-\u2015]'
+    r'|[^\s\-:/\u104A\u104B.,;\(\)\[\]\{\}%\\\u2010-\u2015]+'
+)
+
+# End of a sentence unit: ။ or a line break, with the run of ။ and spaces after it
+SENTENCE_END_PATTERN = re.compile(r'[\u104B\n\r\u2028\u2029][\u104B\s]*')
+
 
 # === syllable break pattern ===
+# Reference definition; tokenizer/syllable_breaker.py implements the same rules as a class table.
 
 my_consonant = r'က-အ'
 en_char = r'a-zA-Z0-9'
@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import mmdt_tokenizer
+
+PACKAGE_ROOT = Path(mmdt_tokenizer.__file__).resolve().parent
+
+_PROBE = """
+import sys
+import mmdt_tokenizer
+print(*sorted(m for m in ("pandas", "numpy", "sqlite3", "multiprocessing") if m in sys.modules))
+"""
+
+
+def _import_in_fresh_interpreter(home):
+    env = dict(os.environ, PYTHONPATH=str(PACKAGE_ROOT.parent), HOME=str(home), PYTHONDONTWRITEBYTECODE="1")
+    env.pop("MMDT_TOKENIZER_CACHE_DIR", None)
+    return subprocess.run([sys.executable, "-c", _PROBE], env=env, cwd=home, capture_output=True,
+                          text=True, check=True).stdout.split()
+
+
+def test_import_is_lazy_and_writes_nothing(tmp_path):
+    # the import-time budget itself is checked by scripts/bench_import.py
+    before = sorted(p for p in PACKAGE_ROOT.rglob("*") if "__pycache__" not in p.parts)
+    assert _import_in_fresh_interpreter(tmp_path) == []
+    assert list(tmp_path.iterdir()) == []
+    assert sorted(p for p in PACKAGE_ROOT.rglob("*") if "__pycache__" not in p.parts) == before
@@ -0,0 +1,95 @@
+from mmdt_tokenizer.preprocessing.preprocess import preprocess_burmese_text
+from mmdt_tokenizer.preprocessing.protector import find_protected_spans
+
+
+def test_find_protected_spans_returns_kinds_in_text_order():
+    text = "ဖုန်း 09 123 456 789 သို့ info@example.com"
+    spans = find_protected_spans(text)
+    assert [text[s:e].strip() for s, e, _ in spans] == ["09 123 456 789", "info@example.com"]
+    assert [k for _, _, k in spans] == ["PHONE", "EMAIL"]
+
+
+def test_find_protected_spans_keeps_pattern_priority():
+    # the email pattern runs first, so later patterns must not re-protect its parts
+    text = "ပို့ရန် a.b@foo.com သို့"
+    spans = find_protected_spans(text)
+    assert [(text[s:e], k) for s, e, k in spans] == [("a.b@foo.com", "EMAIL")]
+
+
+def test_placeholders_resolve_to_protected_text():
+    tokens, protected = preprocess_burmese_text("ဖုန်း 09 123 456 789 ။")
+    assert [protected.get(t, t).strip() for t in tokens] == ["ဖုန်း", "09 123 456 789", "။"]
+
+
+def test_protected_text_keeps_the_pad_a_match_ran_into():
+    # the URL is protected first; the abbreviation match then runs into its pad space,
+    # which the " key " placeholders kept and the spans leave out
+    text = "ဌာန က.ခ.www.foo.org သို့"
+    spans = find_protected_spans(text)
+    assert [(text[s:e], k) for s, e, k in spans] == [("က.ခ.", "ABB_BUR"), ("www.foo.org", "URL")]
+    tokens, protected = preprocess_burmese_text(text)
+    assert [protected.get(t, t) for t in tokens] == ["ဌာန", "က.ခ. ", "www.foo.org", "သို့"]
+
+
+def test_preprocess_spans_map_back_to_original():
+    from mmdt_tokenizer.preprocessing.offsets import OffsetMap
+    from mmdt_tokenizer.preprocessing.preprocess import preprocess_spans
+
+    text = "«ဖုန်း»​  ၁၂ : ၃၀ ... a@b.com"
+    offset_map = OffsetMap()
+    norm, segments = preprocess_spans(text, offset_map)
+    assert [norm[s:e] for s, e, _ in segments] == ["«ဖုန်း»", "၁၂:၃၀", "a@b.com"]
+    assert [k for _, _, k in segments] == ["TEXT", "TIME", "EMAIL"]
+    original = [offset_map.span(s, e) for s, e, _ in segments]
+    assert [text[s:e] for s, e in original] == ["«ဖုန်း»", "၁၂ : ၃၀", "a@b.com"]
+
+
+def test_profile_prefilter_does_not_change_spans():
+    from mmdt_tokenizer.preprocessing.protector import text_profile
+    from mmdt_tokenizer.utils.patterns import PROTECT_TRIGGERS
+
+    assert text_profile("မြန်မာနိုင်ငံ ရန်ကုန်မြို့") == {"CONSONANT"}
+    every_pattern = {t for triggers in PROTECT_TRIGGERS.values() for t in triggers}
+    for text in ["၂၀၂၅ ခုနှစ် မေလ ၅ရက် ၁၂:၃၀", "www.foo.org a@b.com @user", "12.5 1/2 ၁,၀၀၀ က.ခ.", "၁၂၃", "Dr. AB"]:
+        assert find_protected_spans(text) == find_protected_spans(text, profile=every_pattern)
+
+
+def test_run_start_patterns_match_like_the_originals():
+    from mmdt_tokenizer.preprocessing.protector import _finditer
+    from mmdt_tokenizer.utils.patterns import RUN_START_PATTERNS
+
+    date = "၂၀၂၅ ခုနှစ် မေလ ၅ရက်"
+    texts = ["12.5.6 1/2/3 ၁,၀၀၀.", "a.b@c.d@e.com x_y@z", "1" + date, date + date, "9" * 3000 + "x"]
+    for pattern in RUN_START_PATTERNS:
+        for text in texts:
+            assert [m.span() for m in _finditer(pattern, text)] == [m.span() for m in pattern.finditer(text)]
+
+
+def test_long_digit_and_email_runs_stay_linear():
+    # each of these took minutes when every start inside the run was retried
+    for text in ["1" * 200000 + ".", "1" * 200000 + "/", "_" * 200000 + " @"]:
+        assert find_protected_spans(text) == []
+
+
+def test_split_units_cover_text_and_keep_protected_spans():
+    from mmdt_tokenizer.preprocessing.splitter import split_units
+
+    text = "ပို့ရန် a.b@foo.com သို့။ " * 3
+    units = split_units(text, max_chars=40)
+    assert units[0][0] == 0 and units[-1][1] == len(text)
+    assert all(a[1] == b[0] for a, b in zip(units, units[1:]))
+    assert all(text[end - 2:end] == "။ " for _, end in units[:-1])
+    assert split_units(text) == [(0, len(text))]
+    assert split_units("") == [(0, 0)]
+
+    # ။ inside a URL is not a sentence end
+    url = "a b www.foo.org/x။y c"
+    assert [url[s:e] for s, e in split_units(url, max_chars=12)] == ["a b ", "www.foo.org/x။y", " c"]
+
+    # without a space, cuts fall at Myanmar syllables, never inside a Latin word
+    sentence = "စွန့်ခွာသွားတာဖြစ်ပါတယ်"
+    text = sentence + "ArithmeticError" + sentence
+    word = (len(sentence), len(sentence) + len("ArithmeticError"))
+    for max_chars in range(5, 60):
+        units = split_units(text, max_chars)
+        assert not any(word[0] < end < word[1] for _, end in units), max_chars
@@ -0,0 +1,233 @@
+from mmdt_tokenizer.rule_segmenter.scanner import build_lexicon_trie, scan_longest_at
+from mmdt_tokenizer.rule_segmenter.vocab import SyllableVocab, UNK_ID, SKIP_ID
+
+
+def test_vocab_interns_lexicon_syllables_only():
+    vocab = SyllableVocab(["က", "ခ"])
+    ids = vocab.encode(["က", "ဂ", "။", "ခ", "က"])
+    assert list(ids) == [vocab.ids["က"], UNK_ID, SKIP_ID, vocab.ids["ခ"], vocab.ids["က"]]
+    assert vocab.intern("က") == vocab.ids["က"]
+    assert len(vocab) == 4
+
+
+def test_merged_trie_longest_match_and_priority():
+    high = {("က", "ခ"): "A"}
+    low = {("က", "ခ"): "B", ("က", "ခ", "ဂ"): "B", "ဃ": "B"}
+    vocab = SyllableVocab()
+    trie = build_lexicon_trie([(high, "HIGH"), (low, "LOW")], vocab)
+
+    ids = vocab.encode(["က", "ခ", "ဂ", " ", "က", "ခ", "ဃ"])
+    assert scan_longest_at(ids, 0, trie) == (2, "LOW")
+    assert scan_longest_at(ids, 4, trie) == (5, "HIGH")
+    assert scan_longest_at(ids, 3, trie) is None
+    assert vocab.ids["ဂ"] not in trie
+
+
+def test_aho_corasick_agrees_with_trie_scan():
+    from mmdt_tokenizer.rule_segmenter.aho_corasick import AhoCorasick
+
+    pipeline = [
+        ({("က", "ခ", "ဂ", "ဃ"): "X", ("ခ", "ဂ"): "X"}, "HIGH"),
+        ({("ခ", "ဂ", "ဃ", "င"): "Y", ("ဂ",): "Y", "ဃ": "Y", ("က", "ခ"): "Y"}, "LOW"),
+    ]
+    vocab = SyllableVocab()
+    trie = build_lexicon_trie(pipeline, vocab)
+    automaton = AhoCorasick(pipeline, vocab)
+
+    ids = vocab.encode(["က", "ခ", "ဂ", "ဃ", "င", "။", "ခ", "ဂ", "ဃ", " ", "က", "ခ", "ဂ", "ဃ", "စ"])
+    matches = automaton.longest_matches(ids)
+    for i in range(len(ids)):
+        assert matches.get(i) == scan_longest_at(ids, i, trie)
+
+
+def test_word_tokenizer_engines_agree():
+    from mmdt_tokenizer import MyanmarWordTokenizer
+
+    text = "အဲဒီအချိန်ကတည်းကစက်ရုံကို စွန့်ခွာသွားတာဖြစ်ပါတယ်။ ၂၀၂၅ ခုနှစ် မေလ ၅ရက် သည် ရန်ကုန်မြို့"
+    expected = MyanmarWordTokenizer(engine="trie").tokenize(text)
+    assert MyanmarWordTokenizer(engine="aho_corasick").tokenize(text) == expected
+
+
+def test_packed_trie_agrees_with_dict_trie():
+    import random
+    from mmdt_tokenizer.rule_segmenter.engine import LEXICON_TRIE, VOCAB
+    from mmdt_tokenizer.rule_segmenter.packed_trie import PackedTrie
+
+    packed = PackedTrie.from_dict(LEXICON_TRIE)
+    assert packed.starts.keys() == LEXICON_TRIE.keys() and packed.nbytes() == 12 * len(packed) + 4
+    rng = random.Random(0)
+    ids = [rng.choice([UNK_ID, SKIP_ID, rng.randrange(2, len(VOCAB))]) for _ in range(20000)]
+    for i, sid in enumerate(ids):
+        assert (sid in packed) == (sid in LEXICON_TRIE)
+        if sid in LEXICON_TRIE:
+            assert scan_longest_at(ids, i, packed) == scan_longest_at(ids, i, LEXICON_TRIE)
+
+
+def test_tag_precheck_matches_full_pattern_scan():
+    from mmdt_tokenizer.rule_segmenter.engine import _check_pre_defined_tag
+    from mmdt_tokenizer.utils.patterns import TAG_PATTERNS
+
+    def full_scan(token):
+        for tag, patterns in TAG_PATTERNS.items():
+            if any(p.match(token) for p in patterns):
+                return tag
+        return None
+
+    tokens = ["၁၂", "12.5", "+9591234567", "သုံး", "ရာခိုင်နှုန်း", "ကက", "က.ခ.", "abc", "@user",
+              "12/03/2020", "၅ မေလ ၅ရက်", "10:30", "a@b.com", "www.x.org", "http://x", "မြို့", "ါ", "။", "-"]
+    for token in tokens:
+        assert _check_pre_defined_tag(token) == full_scan(token), token
+
+
+def test_protected_spans_keep_their_tag():
+    from mmdt_tokenizer.rule_segmenter.engine import rule_segment
+    from mmdt_tokenizer import MyanmarSyllableTokenizer
+
+    get_syllabus = MyanmarSyllableTokenizer().tokenize_one
+    chunks = rule_segment("test@example.com နှင့် www.foo.org သို့ 1/2 ခု", True, get_syllabus)
+    tags = {c.text: c.tag for c in chunks}
+    # the same tags TAG_PATTERNS gives the protected text
+    assert tags["test@example.com"] == "ORG"
+    assert tags["www.foo.org"] == "ORG"
+    assert tags["1/2"] == "RAW"
+
+
+def test_fused_clean_pass_matches_separate_passes():
+    import random
+    from mmdt_tokenizer.rule_segmenter.types import Chunk
+    from mmdt_tokenizer.rule_segmenter.cleanner import (
+        clean_sfp_chunks, clean_cls_tag, clean_postp_tag, clean_chunks, clean_after_merge,
+        NEG_SENT_SFP, ISOLATED_SFP_TO_POSTP, DAY_CL, MTH_CL, PNUM_CL, REGION_CL, SPECIAL_POSTP)
+
+    tags = ["PRED", "CONJ", "SFP", "VEP", "PUNCT", "CL", "NUM", "WORDNUM", "DAY", "MONTH", "REGION", "POSTP", "RAW"]
+    texts = [*NEG_SENT_SFP, *ISOLATED_SFP_TO_POSTP, *DAY_CL, MTH_CL, *PNUM_CL, REGION_CL[0], *SPECIAL_POSTP,
+             "အ", "x", "​", "။"]
+    rng = random.Random(0)
+    for _ in range(3000):
+        chunks = [Chunk((i, i), rng.choice(texts), rng.choice(tags)) for i in range(rng.randint(0, 8))]
+        expected = clean_chunks(clean_postp_tag(clean_cls_tag(clean_sfp_chunks(chunks))))
+        assert clean_after_merge(chunks) == expected
+
+
+def test_chunk_buffer_round_trip():
+    from mmdt_tokenizer.rule_segmenter.types import Chunk, ChunkBuffer, Tag
+
+    buf = ChunkBuffer(["မ", "သွား", "ဘူး", " "])
+    buf.append(0, 2, Tag.PRED)
+    buf.append(3, 3, Tag.PUNCT)
+    chunks = [Chunk((0, 2), "မသွားဘူး", "PRED"), Chunk((3, 3), " ", "PUNCT")]
+    assert buf.to_chunks() == chunks
+    assert ChunkBuffer.from_chunks(chunks).to_chunks() == chunks
+
+
+def test_buffer_passes_match_chunk_passes():
+    import random
+    from mmdt_tokenizer.rule_segmenter.types import ChunkBuffer, Tag
+    from mmdt_tokenizer.rule_segmenter.cleanner import (
+        clean_wordnum_tag, clean_after_merge, clean_wordnum_buffer, clean_after_merge_buffer)
+    from mmdt_tokenizer.rule_segmenter.merge_ops import (
+        merge_num_classifier, merge_predicate, merge_num_classifier_buffer, merge_predicate_buffer)
+
+    tokens = ["နဲ့", "ပြီ", "နေ့", "အကြိမ်", "ကို", "အ", "မ", "ပါ", "လား", "ရာ", "ခိုင်", "နှုန်း",
+              "နှစ်", "ဦး", "1", "2 3", " ", "။", "x​"]
+    tags = ["PRED", "CONJ", "SFP", "VEP", "PUNCT", "CL", "CLEP", "NUM", "WORDNUM", "DAY", "POSTP", "RAW", "QW"]
+    rng = random.Random(0)
+    for _ in range(3000):
+        buf = ChunkBuffer([rng.choice(tokens) for _ in range(rng.randint(0, 12))])
+        i = 0
+        while i < len(buf.tokens):
+            end = min(len(buf.tokens) - 1, i + rng.choice([0, 0, 1, 2]))
+            buf.append(i, end, Tag[rng.choice(tags)])
+            i = end + 1
+        chunks = buf.to_chunks()
+        expected = clean_after_merge(merge_predicate(merge_num_classifier(clean_wordnum_tag(chunks))))
+        out = clean_after_merge_buffer(merge_predicate_buffer(merge_num_classifier_buffer(clean_wordnum_buffer(buf))))
+        assert out.to_chunks() == expected
+
+
+def test_phrase_memo_matches_unmemoized_segmentation():
+    from mmdt_tokenizer.rule_segmenter.engine import rule_segment, sizeof_phrase_entry
+    from mmdt_tokenizer.utils.cache import LRUCache
+    from mmdt_tokenizer import MyanmarSyllableTokenizer
+
+    get_syllabus = MyanmarSyllableTokenizer().tokenize_one
+    texts = ["အဲဒီအချိန်ကတည်းကစက်ရုံကို စွန့်ခွာသွားတာဖြစ်ပါတယ်။ကြိုးစားသော်လည်း စာမေးပွဲကျပါသည်။သို့သော် စိတ်မပျက်ပါ။", "၂၀၂၅ ခုနှစ် မေလ ၅ရက် သည် ကျွန်မတို့အတွက် အရေးပါသည်", "test@example.com John's ၁၂:၃၀"]
+    memo = LRUCache(1 << 20, sizeof_phrase_entry)
+    for engine in ("trie", "aho_corasick"):
+        for text in texts * 2:
+            assert rule_segment(text, True, get_syllabus, engine, memo) == rule_segment(text, True, get_syllabus, engine)
+    stats = memo.stats()
+    assert stats["hits"] > stats["misses"] > 0
+
+    small = LRUCache(600, sizeof_phrase_entry)
+    for text in texts * 2:
+        assert rule_segment(text, True, get_syllabus, memo=small) == rule_segment(text, True, get_syllabus)
+    assert small.evictions > 0 and small.bytes <= 600
+
+
+def test_lexicon_snapshot_round_trip_and_rebuild(tmp_path):
+    from mmdt_tokenizer.rule_segmenter.engine import PIPELINE, VOCAB, LEXICON_TRIE
+    from mmdt_tokenizer.rule_segmenter.snapshot import load_lexicon_trie
+
+    built_vocab, built = load_lexicon_trie(PIPELINE, "v1", directory=str(tmp_path))
+    (path,) = tmp_path.iterdir()
+    loaded_vocab, loaded = load_lexicon_trie(PIPELINE, "v1", directory=str(tmp_path))
+    assert loaded == built == LEXICON_TRIE and loaded_vocab.ids == built_vocab.ids == VOCAB.ids
+
+    # a snapshot with another fingerprint in the file (or a broken file) is rebuilt
+    small = [({("က", "ခ"): "X"}, "CONJ")]
+    path.rename(tmp_path / "lexicon-v2.marshal")
+    vocab, trie = load_lexicon_trie(small, "v2", directory=str(tmp_path))
+    assert list(trie) == [vocab.ids["က"]] and len(vocab) == 4
+    (tmp_path / "lexicon-v2.marshal").write_bytes(b"\x00broken")
+    assert load_lexicon_trie(small, "v2", directory=str(tmp_path))[1] == trie
+    assert load_lexicon_trie(small, "v2", directory=str(tmp_path))[1] == trie
+
+
+def test_bundled_lexicon_snapshot_is_current(tmp_path):
+    import marshal
+    from mmdt_tokenizer.rule_segmenter.engine import PIPELINE, VOCAB, LEXICON_TRIE
+    from mmdt_tokenizer.rule_segmenter.scanner import build_lexicon_trie
+    from mmdt_tokenizer.rule_segmenter.snapshot import BUNDLED_SNAPSHOT, lexicon_fingerprint, load_lexicon_trie
+    from mmdt_tokenizer.rule_segmenter.vocab import SyllableVocab
+
+    # stale after a lexicon change: run scripts/build_lexicon_snapshot.py
+    with open(BUNDLED_SNAPSHOT, "rb") as f:
+        assert marshal.loads(f.read())[0] == lexicon_fingerprint()
+    vocab = SyllableVocab()
+    assert build_lexicon_trie(PIPELINE, vocab) == LEXICON_TRIE and vocab.ids == VOCAB.ids
+
+    # a snapshot of other sources is ignored: built in memory, nothing written
+    small = [({("က", "ခ"): "X"}, "CONJ")]
+    vocab, trie = load_lexicon_trie(small, "other", directory=None)
+    assert list(trie) == [vocab.ids["က"]] and list(tmp_path.iterdir()) == []
+
+
+def test_mapped_dictionary_joins_the_pipeline(tmp_path):
+    import pickle
+    from mmdt_tokenizer import MyanmarWordTokenizer, MyanmarSyllableTokenizer
+    from mmdt_tokenizer.rule_segmenter.engine import rule_segment
+    from mmdt_tokenizer.rule_segmenter.mapped_lexicon import compile_lexicon, open_mapped_lexicon
+
+    text = "အဲဒီအချိန်ကတည်းကစက်ရုံကို စွန့်ခွာသွားတာဖြစ်ပါတယ်။"
+    (tmp_path / "words.tsv").write_text("# domain words\nစက်ရုံကို\n\nစွန့်ခွာ\tREGION\n", encoding="utf-8")
+    path = str(tmp_path / "words.lex")
+    compile_lexicon([(str(tmp_path / "words.tsv"), "SWORD")], path)
+    lexicon = open_mapped_lexicon(path)
+    assert open_mapped_lexicon(path) is lexicon and isinstance(lexicon.trie.label, memoryview)
+
+    plain = MyanmarWordTokenizer()
+    tokenizer = MyanmarWordTokenizer(dictionaries=[path])
+    assert plain.tokenize_one(text)[2:5] == ["စက်ရုံ", "ကို", "စွန့်ခွာ"]
+    assert tokenizer.tokenize_one(text)[2:4] == ["စက်ရုံကို", "စွန့်ခွာ"]
+    assert pickle.loads(pickle.dumps(tokenizer)).tokenize_one(text) == tokenizer.tokenize_one(text)
+    assert tokenizer.tokenize([text] * 4, n_jobs=2) == [tokenizer.tokenize_one(text)] * 4
+
+    # equal-length matches rank by PIPELINE order against the bundled lexicons
+    get_syllabus = MyanmarSyllableTokenizer().tokenize_one
+    tags = {c.text: c.tag for c in rule_segment(text, True, get_syllabus, lexicons=[lexicon])}
+    assert tags["စက်ရုံကို"] == "SWORD" and tags["စွန့်ခွာ"] == "REGION"
+    (tmp_path / "low.tsv").write_text("ကို\tCLEP\n", encoding="utf-8")
+    compile_lexicon([str(tmp_path / "low.tsv")], str(tmp_path / "low.lex"))
+    low = open_mapped_lexicon(str(tmp_path / "low.lex"))
+    assert rule_segment(text, True, get_syllabus, lexicons=[low]) == rule_segment(text, True, get_syllabus)
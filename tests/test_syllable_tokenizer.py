@@ -0,0 +1,43 @@
+import pytest
+
+from mmdt_tokenizer import MyanmarSyllableTokenizer
+from mmdt_tokenizer.tokenizer.syllable_breaker import syllable_spans
+from mmdt_tokenizer.utils.patterns import SYLLABLE_BREAK_PATTERN
+
+
+def _regex_break(text, separator=" "):
+    segmented = SYLLABLE_BREAK_PATTERN.sub(separator + r"\1", text.strip())
+    return [tok for tok in segmented.lstrip(separator).split(separator) if tok]
+
+
+@pytest.mark.parametrize("text", [
+    "မြန်မာစာ",
+    "  ဥက္ကဋ္ဌ သ္မီး ဥ်  ",
+    "ကျွန်မတို့\tအတွက်\nAB12 ၁၂/၀၅ ",
+    "ဣဤဦဧဩဪဿ၌၍၏။၊",
+    "ာက ်ခ",
+    "",
+])
+def test_syllable_spans_match_regex(text):
+    assert [text[s:e] for s, e in syllable_spans(text)] == _regex_break(text)
+
+
+def test_separator_inside_text_is_not_split():
+    tokenizer = MyanmarSyllableTokenizer(separator="|")
+    assert tokenizer.tokenize_one("က|ခ") == ["က", "|", "ခ"]
+    assert tokenizer.tokenize("ကခ", return_list=False) == ["က|ခ"]
+
+
+def test_syllable_cache_shared_with_word_tokenizer():
+    import pickle
+    from mmdt_tokenizer import MyanmarTokenizer
+
+    tokenizer = MyanmarTokenizer(cache=1 << 20)
+    cache = tokenizer.syllable_tokenizer.cache
+    assert cache is tokenizer.word_tokenizer.cache
+    assert tokenizer.syllable_tokenize(["မြန်မာစာ", "မြန်မာစာ"]) == [["မြန်", "မာ", "စာ"]] * 2
+    assert tokenizer.word_tokenize("မြန်မာစာ") == MyanmarTokenizer().word_tokenize("မြန်မာစာ")
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["hits"] == 1
+    clone = pickle.loads(pickle.dumps(tokenizer.syllable_tokenizer))
+    assert clone.cache.max_bytes == cache.max_bytes and len(clone.cache) == 0
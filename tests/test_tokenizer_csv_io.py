@@ -8,6 +8,12 @@ from mmdt_tokenizer.tokenizer.syllable_tokenizer import MyanmarSyllableTokenizer
 from mmdt_tokenizer.utils.config import DATA_DIR, OUTPUT_DIR
 
 
+@pytest.fixture(scope="module", autouse=True)
+def output_dir():
+    # the package no longer creates its data/result folders at import
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    return OUTPUT_DIR
+
 @pytest.fixture(scope="module")
 def tokenizer():
     return MyanmarTokenizer()
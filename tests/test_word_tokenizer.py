@@ -1,5 +1,9 @@
+import multiprocessing
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
 import pytest
-from mmdt_tokenizer import MyanmarTokenizer
+from mmdt_tokenizer import MyanmarTokenizer, MyanmarWordTokenizer
 
 @pytest.fixture(scope="module")
 def tokenizer():
@@ -30,4 +34,259 @@ def test_punctuation_only(tokenizer):
     text = "။၊?"
     tokens = tokenizer.word_tokenize(text)
     expected = [[]]
-    assert tokens == expected
\ No newline at end of file
+    assert tokens == expected
+
+def test_tokenize_one_and_batch_match_tokenize(tokenizer):
+    texts = [
+        "အစီအစဥ်ကို သူမ စိတ်ဆိုး မနေပါဘူး",
+        "၂၀၂၅ ခုနှစ် မေလ ၅ရက် သည် ကျွန်မတို့အတွက် အရေးပါသည်",
+        "",
+    ]
+    word_tokenizer = tokenizer.word_tokenizer
+    expected = word_tokenizer.tokenize(texts)
+    assert word_tokenizer.tokenize_batch(texts) == expected
+    assert [word_tokenizer.tokenize_one(t) for t in texts] == expected
+
+
+def test_syllable_tokenize_one_and_batch(tokenizer):
+    syllable_tokenizer = tokenizer.syllable_tokenizer
+    text = "မြန်မာစာ"
+    assert syllable_tokenizer.tokenize_one(text) == ["မြန်", "မာ", "စာ"]
+    assert syllable_tokenizer.tokenize_batch([text, ""]) == [["မြန်", "မာ", "စာ"], []]
+
+
+def test_process_pool_keeps_order_and_results(tokenizer):
+    texts = [
+        "အစီအစဥ်ကို သူမ စိတ်ဆိုး မနေပါဘူး",
+        "၂၀၂၅ ခုနှစ် မေလ ၅ရက် သည် ကျွန်မတို့အတွက် အရေးပါသည်",
+        "ကြိုးစားသော်လည်း စာမေးပွဲကျပါသည်။",
+    ] * 5
+    word_tokenizer = tokenizer.word_tokenizer
+    expected = word_tokenizer.tokenize(texts)
+    assert word_tokenizer.tokenize(texts, n_jobs=2, chunksize=2) == expected
+    assert list(word_tokenizer.itokenize(iter(texts), n_jobs=2, chunksize=3)) == expected
+
+
+def test_tokenizers_pickle_as_config(tokenizer):
+    word_tokenizer = MyanmarWordTokenizer(protect_pattern=False, engine="aho_corasick")
+    payload = pickle.dumps(word_tokenizer)
+    assert len(payload) < 200
+    clone = pickle.loads(payload)
+    assert (clone.protect_pattern, clone.engine) == (False, "aho_corasick")
+    assert clone.phrase_memo is None and MyanmarWordTokenizer(phrase_memo=1 << 20).phrase_memo is not None
+
+    text = "အစီအစဥ်ကို သူမ စိတ်ဆိုး မနေပါဘူး"
+    assert pickle.loads(pickle.dumps(tokenizer)).word_tokenize(text) == tokenizer.word_tokenize(text)
+    assert pickle.loads(pickle.dumps(tokenizer.syllable_tokenizer)).tokenize_one(text) == \
+        tokenizer.syllable_tokenizer.tokenize_one(text)
+
+
+def test_tokenizer_ships_to_spawned_workers(tokenizer):
+    texts = ["အစီအစဥ်ကို သူမ စိတ်ဆိုး မနေပါဘူး", "ကြိုးစားသော်လည်း စာမေးပွဲကျပါသည်။"]
+    word_tokenizer = tokenizer.word_tokenizer
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        assert list(executor.map(word_tokenizer.tokenize_one, texts)) == word_tokenizer.tokenize_batch(texts)
+
+
+def test_word_offsets_index_original_text(tokenizer):
+    text = "ရန်ကုန်မြို့တွင်​ ၁၂ : ၃၀ နာရီ...ဖုန်း 09 123 456 789 သို့။"
+    word_tokenizer = tokenizer.word_tokenizer
+    words = word_tokenizer.tokenize_with_offsets(text)
+    assert [w for w, _, _ in words] == word_tokenizer.tokenize_one(text)
+    spans = {w: text[start:end] for w, start, end in words}
+    assert spans["ရန်ကုန်"] == "ရန်ကုန်"
+    assert spans["၁၂:၃၀"] == "၁၂ : ၃၀"
+    assert spans["09123456789"] == "09 123 456 789"
+
+
+def test_sentence_units_tokenize_in_parallel_with_offsets():
+    from mmdt_tokenizer import MyanmarWordTokenizer
+
+    text = "အဲဒီအချိန်ကတည်းကစက်ရုံကို စွန့်ခွာသွားတာဖြစ်ပါတယ်။ကြိုးစားသော်လည်း စာမေးပွဲကျပါသည်။သို့သော် စိတ်မပျက်ပါ။" * 4
+    whole = MyanmarWordTokenizer(split_sentences=True)
+    units = MyanmarWordTokenizer(split_sentences=True, max_unit_chars=60)
+    assert whole.tokenize_one(text) == MyanmarWordTokenizer().tokenize_one(text)
+    assert units.tokenize([text, text], n_jobs=2) == [units.tokenize_one(text)] * 2
+    assert list(units.itokenize([text], n_jobs=2, chunksize=1)) == [units.tokenize_one(text)]
+
+    words = units.tokenize_with_offsets(text, n_jobs=2)
+    assert words == units.tokenize_with_offsets(text)
+    assert [w for w, _, _ in words] == units.tokenize_one(text)
+    assert all(text[start:end] == w for w, start, end in words)
+    with pytest.raises(ValueError):
+        MyanmarWordTokenizer().tokenize_with_offsets(text, n_jobs=2)
+
+    # unit workers get the tokenizer's own phrase memo budget
+    assert units._unit_config()[5] == 0
+    assert MyanmarWordTokenizer(split_sentences=True, phrase_memo=1 << 20)._unit_config()[5] == 1 << 20
+
+
+def test_result_cache_counts_and_evicts():
+    import threading
+    from mmdt_tokenizer import MyanmarWordTokenizer
+    from mmdt_tokenizer.utils.cache import LRUCache
+
+    texts = ["အစီအစဥ်ကို သူမ စိတ်ဆိုး မနေပါဘူး", "ကြိုးစားသော်လည်း စာမေးပွဲကျပါသည်။"]
+    plain = MyanmarWordTokenizer()
+    cached = MyanmarWordTokenizer(cache=1 << 20)
+    assert cached.tokenize(texts * 3) == plain.tokenize(texts * 3)
+    assert cached.cache.stats()["hits"] == 4 and cached.cache.stats()["misses"] == 2
+    cached.tokenize_one(texts[0]).append("x")  # callers get their own list
+    assert cached.tokenize_one(texts[0]) == plain.tokenize_one(texts[0])
+
+    threads = [threading.Thread(target=cached.tokenize_batch, args=(texts * 50,)) for _ in range(4)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    stats = cached.cache.stats()
+    assert stats["hits"] + stats["misses"] == 6 + 1 + 1 + 400 and stats["entries"] == 2
+
+    cache = LRUCache(max_bytes=1500)
+    for i in range(20):
+        cache.put(("ns", str(i) * 50), ("a", "b"))
+    assert cache.get(("ns", "0" * 50)) is None and cache.get(("ns", "19" * 50)) == ("a", "b")
+    assert cache.evictions > 0 and cache.bytes <= 1500
+
+
+def test_batch_dedup_scatters_results(tokenizer):
+    import pandas as pd
+    from mmdt_tokenizer import MyanmarWordTokenizer
+
+    texts = ["အစီအစဥ်ကို သူမ စိတ်ဆိုး မနေပါဘူး", "ကြိုးစားသော်လည်း စာမေးပွဲကျပါသည်။", ""] * 30
+    word_tokenizer = MyanmarWordTokenizer()
+    expected = [word_tokenizer.tokenize_one(t) for t in texts]
+    assert word_tokenizer.tokenize(pd.Series(texts)) == expected
+    assert word_tokenizer.stats()["dedup_texts"] == 90 and word_tokenizer.stats()["dedup_unique"] == 3
+    assert word_tokenizer.stats()["dedup_ratio"] == 1 - 3 / 90
+
+    results = word_tokenizer.tokenize(texts[:6], dedup=True)
+    assert results == expected[:6] and results[0] is not results[3]
+    word_tokenizer.tokenize(texts[:6])  # below DEDUP_MIN_BATCH: not deduplicated
+    assert word_tokenizer.stats()["dedup_texts"] == 96
+
+
+def test_disk_cache_persists_across_tokenizers(tmp_path):
+    from mmdt_tokenizer import MyanmarWordTokenizer
+    from mmdt_tokenizer.utils.disk_cache import DiskCache
+
+    texts = ["အစီအစဥ်ကို သူမ စိတ်ဆိုး မနေပါဘူး", "ကြိုးစားသော်လည်း စာမေးပွဲကျပါသည်။"]
+    expected = MyanmarWordTokenizer().tokenize(texts)
+    path = tmp_path / "tokens.sqlite"
+    assert MyanmarWordTokenizer(disk_cache=path).tokenize(texts) == expected
+
+    again = MyanmarWordTokenizer(disk_cache=path)
+    assert again.tokenize(texts + ["ကြိုးစား"]) == expected + [MyanmarWordTokenizer().tokenize_one("ကြိုးစား")]
+    assert again.stats()["disk_cache"]["hits"] == 2 and again.stats()["disk_cache"]["entries"] == 3
+    # another configuration does not read these entries
+    other = MyanmarWordTokenizer(disk_cache=again.disk_cache, engine="aho_corasick")
+    other.tokenize(texts)
+    assert other.disk_cache.stats()["misses"] == 3
+
+    small = DiskCache(tmp_path / "small.sqlite", max_bytes=2000)
+    for i in range(40):
+        small.put_many([(DiskCache.key("ns", str(i)), ["a"] * 10)])
+    assert 0 < small.stats()["entries"] < 40 and small.bytes <= 2000
+    assert DiskCache.key("ns", "39") in small.get_many([DiskCache.key("ns", "39")])
+
+    # rewriting keys, in one batch or across writers, does not inflate the byte count
+    shared = DiskCache(tmp_path / "shared.sqlite")
+    rows = [(DiskCache.key("ns", str(i % 3)), ["a"] * 10) for i in range(9)]
+    shared.put_many(rows)
+    DiskCache(tmp_path / "shared.sqlite").put_many(rows)
+    shared.put_many(rows)
+    assert shared.bytes == shared._conn.execute("SELECT SUM(size) FROM tokens").fetchone()[0]
+
+
+def test_retokenize_matches_full_tokenization():
+    from mmdt_tokenizer import MyanmarWordTokenizer
+
+    original = "အစီအစဥ်ကို သူမ စိတ်ဆိုး မနေပါဘူး။ ကြိုးစားသော်လည်း စာမေးပွဲကျပါသည်။\n" * 5
+    edits = [(40, 0, "ယနေ့ "), (0, 3, ""), (len(original) - 10, 10, "၂၀၂၅ ခုနှစ်"), (120, 30, "က"),
+             (75, 0, "စိတ်ဆိုး")]
+    # small units are cut inside sentences, and an edit moves the cuts after it
+    for tokenizer in (MyanmarWordTokenizer(), MyanmarWordTokenizer(split_sentences=True),
+                      MyanmarWordTokenizer(split_sentences=True, max_unit_chars=100),
+                      MyanmarWordTokenizer(split_sentences=True, max_unit_chars=40)):
+        text = original
+        words = tokenizer.tokenize_with_offsets(text)
+        for offset, deleted, inserted in edits:
+            text, words = tokenizer.retokenize(text, words, offset, deleted, inserted)
+            assert words == tokenizer.tokenize_with_offsets(text)
+        words = tokenizer.tokenize_with_offsets(original)
+        for offset, deleted, inserted in [(290, 10, ""), (229, 3, " ")]:
+            text, new_words = tokenizer.retokenize(original, words, offset, deleted, inserted)
+            assert new_words == tokenizer.tokenize_with_offsets(text)
+
+
+def test_runtime_lexicon_edits():
+    import copy
+    import pickle
+    import threading
+    from mmdt_tokenizer import MyanmarWordTokenizer
+    from mmdt_tokenizer.rule_segmenter.engine import LEXICON_TRIE, VOCAB
+    from mmdt_tokenizer.rule_segmenter.scanner import scan_longest_at
+    from mmdt_tokenizer.tokenizer.parallel import _WORKER_TOKENIZERS, _segment_in_worker, publish_user_lexicon
+
+    text = "အဲဒီအချိန်ကတည်းကစက်ရုံကို စွန့်ခွာသွားတာဖြစ်ပါတယ်။ကြိုးစားသော်လည်း စာမေးပွဲကျပါသည်။"
+    bundled = copy.deepcopy(LEXICON_TRIE)
+    tokenizer = MyanmarWordTokenizer(cache=1 << 20)
+    before = tokenizer.tokenize_one(text)
+    syllables = tokenizer.syllable_tokenizer.tokenize_one
+    place, conj = tuple(syllables("စက်ရုံကို")), tuple(syllables("ကတည်းက"))
+
+    tokenizer.add_entries({place: "REGION"})
+    tokenizer.remove_entries([conj])
+    after = tokenizer.tokenize_one(text)
+    assert "စက်ရုံကို" in after and "ကတည်းက" not in after
+    assert tokenizer.lexicon_entries() == {place: ("REGION",), conj: ()}
+    assert [c.tag for c in tokenizer._tokenize_one(text) if c.text == "စက်ရုံကို"] == ["REGION"]
+    assert LEXICON_TRIE == bundled
+
+    # the Aho–Corasick engine gets an automaton of the edited trie; copies get the edits through their config
+    other = MyanmarWordTokenizer(engine="aho_corasick", lexicon_entries=tokenizer.lexicon_entries().items())
+    assert other.tokenize_one(text) == after
+    ids = VOCAB.encode(syllables(text * 3))
+    automaton = other._user_lexicon.automaton()
+    assert automaton.longest_matches(ids) == {i: hit for i in range(len(ids))
+                                              if (hit := scan_longest_at(ids, i, other._user_lexicon.trie))}
+    assert pickle.loads(pickle.dumps(tokenizer)).tokenize_one(text) == after
+    assert tokenizer.tokenize([text] * 4, n_jobs=2) == [after] * 4
+
+    # readers on another thread see one state or the other, never a mix
+    tokenizer.remove_entries([place])
+    middle = tokenizer.tokenize_one(text)
+    tokenizer.add_entries({place: "REGION"})
+    seen = set()
+    stop = threading.Event()
+    reader = threading.Thread(target=lambda: [seen.add(tuple(tokenizer.tokenize_one(text)))
+                                              for _ in iter(stop.is_set, True)])
+    reader.start()
+    for _ in range(50):
+        tokenizer.remove_entries([place])
+        tokenizer.add_entries({place: "REGION"})
+    stop.set()
+    reader.join()
+    assert seen and seen <= {tuple(after), tuple(middle)}
+
+    # an edit landing mid-call neither leaks into that call nor into its cached result
+    tokenizer.cache.clear()
+    words = tokenizer._words
+    def edited_midway(text, user_lexicon):
+        tokenizer.remove_entries([place])
+        return words(text, user_lexicon)
+    tokenizer._words = edited_midway
+    assert tokenizer.tokenize_one(text) == after
+    del tokenizer._words
+    assert tokenizer.tokenize_one(text) == middle
+    tokenizer.add_entries({place: "REGION"})
+    assert tokenizer.tokenize_one(text) == after
+
+    # workers keep one tokenizer per configuration and load each set of edits once
+    config = tokenizer._base_config()
+    assert config == MyanmarWordTokenizer(cache=1 << 20)._config()
+    for lexicon, expected in [(publish_user_lexicon(tokenizer._user_lexicon), after), (None, before)] * 2:
+        assert _segment_in_worker(config, lexicon, "tokenize_one", text) == expected
+    assert _WORKER_TOKENIZERS[config]._user_lexicon is None
+
+    tokenizer.remove_entries([place])
+    tokenizer.add_entries({conj: "CONJ"})
+    assert tokenizer.lexicon_entries() == {} and tokenizer.tokenize_one(text) == before